@@ -10,48 +10,46 @@ La lógica del agente y la interfaz se encuentran en los módulos correspondient
 - modelos/agente.py: Clase principal del agente
 - interfaz/ventana.py: Interfaz gráfica
 - utils/procesador_lenguaje.py: Procesamiento de texto
+- utils/motores/: Motores de análisis (spaCy o léxico en Python puro)
 - config/constantes.py: Configuraciones y constantes
 """
 
 from interfaz.ventana import InterfazAgente
+from config.constantes import MOTOR_ANALISIS
+from utils.motores import diagnosticar_spacy
 from tkinter import messagebox, Tk
 import sys
 
 
 def verificar_dependencias() -> bool:
-    """Verifica que las dependencias críticas (spaCy y modelo) estén instaladas.
+    """Verifica que el motor de análisis configurado pueda usarse.
 
-    Si falta algo, muestra un mensaje con instrucciones y retorna False.
+    Con MOTOR_ANALISIS = "auto" (o "lexico") la aplicación siempre puede
+    iniciar: si falta spaCy o su modelo se usa el motor léxico. Solo cuando se
+    exige "spacy" y falta algo se muestra un mensaje con instrucciones y se
+    retorna False. La comprobación no carga spaCy.
     """
-    try:
-        import spacy
-    except Exception:
-        # Mostrar un mensaje claro y terminar
-        root = Tk()
-        root.withdraw()
+    if MOTOR_ANALISIS != "spacy":
+        return True
+
+    falta = diagnosticar_spacy()
+    if falta is None:
+        return True
+
+    root = Tk()
+    root.withdraw()
+    if falta == "libreria":
         messagebox.showerror(
             "Dependencias faltantes",
-            "Falta la librería 'spacy'.\nInstálala con:\n  pip install -r requirements.txt"
+            "Falta la librería 'spacy' o 'textblob'.\nInstálalas con:\n  pip install -r requirements.txt"
         )
-        root.destroy()
-        return False
-
-    # Intentar cargar el modelo md, fallback a sm; si ninguno está, mostrar instrucción
-    try:
-        spacy.load('es_core_news_md')
-    except Exception:
-        try:
-            spacy.load('es_core_news_sm')
-        except Exception:
-            root = Tk()
-            root.withdraw()
-            messagebox.showerror(
-                "Modelo spaCy no encontrado",
-                "No se encontró un modelo de spaCy en español.\nEjecuta:\n  python -m spacy download es_core_news_md\n(o: python -m spacy download es_core_news_sm)"
-            )
-            root.destroy()
-            return False
-    return True
+    else:
+        messagebox.showerror(
+            "Modelo spaCy no encontrado",
+            "No se encontró un modelo de spaCy en español.\nEjecuta:\n  python -m spacy download es_core_news_md\n(o: python -m spacy download es_core_news_sm)"
+        )
+    root.destroy()
+    return False
 
 if __name__ == "__main__":
     try:
@@ -85,4 +85,59 @@ TIPS_MOTIVACIONALES = [
     "🎯 Establece metas pequeñas y alcanzables",
     "📚 Alterna entre diferentes materias para mantener el interés",
     "🌟 Celebra tus pequeños logros"
-]
\ No newline at end of file
+]
+
+# Evaluación en sombra: motor alternativo de estado de ánimo que se ejecuta
+# fuera del camino crítico para compararlo con `analizar_estado_animo`.
+# Formato "modulo:funcion" (la función recibe el texto y retorna el estado),
+# o None para desactivar el modo sombra.
+MOTOR_SOMBRA = None
+RUTA_LOG_SOMBRA = "sombra_animo.jsonl"
+MAX_PENDIENTES_SOMBRA = 100
+# Ejecutar el motor en sombra en un proceso aparte, para que un motor pesado
+# no compita por el GIL con la interfaz y el análisis principal
+SOMBRA_EN_SUBPROCESO = False
+# Segundos que se esperan al cerrar la aplicación para procesar lo pendiente;
+# lo que quede se anota como descartado
+PLAZO_CIERRE_SOMBRA_S = 2.0
+
+# Modelo spaCy con vectores reducidos, generado con
+#   python -m utils.vectores reducir --filas 20000 --float16 --salida <carpeta>
+# None para usar el modelo instalado (es_core_news_md o es_core_news_sm).
+RUTA_MODELO_REDUCIDO = None
+# Leer los vectores del modelo reducido mapeados en memoria (compartidos entre procesos)
+VECTORES_MMAP = True
+
+# Retención del historial: los registros con más días que esta ventana se
+# agrupan en resúmenes diarios por estado de ánimo y tiempo.
+DIAS_RETENCION_HISTORIAL = 30
+FORMATO_FECHA_HISTORIAL = "%Y-%m-%d %H:%M"
+
+# Motor de análisis de texto: "spacy" (spaCy + TextBlob), "lexico" (Python puro)
+# o "auto" (spaCy si está instalado con un modelo en español; si no, "lexico")
+MOTOR_ANALISIS = "auto"
+
+# Caché persistente (SQLite) de los resultados de análisis, compartida entre
+# reinicios y procesos. RUTA_CACHE_ANALISIS = None la desactiva.
+RUTA_CACHE_ANALISIS = "cache_analisis.sqlite3"
+CACHE_MAX_ENTRADAS = 20000
+# Entradas más usadas que se cargan en memoria al iniciar
+CACHE_PRECARGA = 2000
+
+# Presupuesto de latencia (ms) del análisis en la conversación. Si el análisis
+# completo no termina a tiempo se responde con un nivel más barato: solo
+# palabras clave y, si no hay ninguna, un estado neutral. None lo desactiva.
+PRESUPUESTO_ANALISIS_MS = 300
+CONFIANZA_PALABRAS_CLAVE = 0.3
+CONFIANZA_NEUTRAL = 0.0
+# Registro (JSON Lines) de cuántas respuestas se dieron en cada nivel, para
+# dimensionar el hardware: python -m utils.plazos
+RUTA_LOG_DEGRADACION = "degradacion.jsonl"
+
+# Pool de procesos pre-fork (solo Linux/macOS): el proceso padre carga el
+# modelo una vez y lo comparte copy-on-write con sus trabajadores.
+RUTA_SOCKET_POOL = "agente_analisis.sock"
+# Número de trabajadores; None usa un trabajador por núcleo
+TRABAJADORES_POOL = None
+# Peticiones que atiende cada trabajador antes de ser reemplazado
+MAX_PETICIONES_TRABAJADOR = 10000
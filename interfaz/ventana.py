@@ -5,6 +5,7 @@ import tkinter as tk
 from tkinter import scrolledtext, ttk
 from datetime import datetime
 import json
+import time
 from pathlib import Path
 import os
 import sys
@@ -16,11 +17,21 @@ import sys
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 from modelos.agente import AgenteEstudio
-from utils.procesador_lenguaje import analizar_estado_animo, analizar_tiempo
+from config.constantes import FORMATO_FECHA_HISTORIAL, PRESUPUESTO_ANALISIS_MS
+from utils.procesador_lenguaje import analizar_estado_animo, analizar_tiempo, analizar_mensaje
+from utils.evaluacion_sombra import crear_evaluador
+from utils.cache_analisis import iniciar_cache, cerrar_cache
+from utils.plazos import calentar_motor, iniciar_registro, guardar_estadisticas
 
 class InterfazAgente:
     def __init__(self):
         self.agente = AgenteEstudio()
+        self.evaluador_sombra = crear_evaluador()
+        # Precargar los análisis frecuentes de sesiones anteriores
+        iniciar_cache()
+        # Cargar el motor en segundo plano: el primer mensaje no espera a spaCy
+        calentar_motor()
+        iniciar_registro()
         self.ventana = tk.Tk()
         self.ventana.title("🎓 Agente de Estudio - UMG")
         self.ventana.geometry("500x600")
@@ -126,11 +137,12 @@ class InterfazAgente:
     def _iniciar_conversacion(self):
         """Inicia la conversación con el mensaje de bienvenida"""
         self.estado_conversacion = "esperar_animo"
+        self.tiempo_pendiente = None
         self.mostrar_mensaje("¡Hola! Soy tu Agente de Estudio 🎓")
         self.mostrar_mensaje("Cuéntame, ¿cómo te sientes hoy?")
 
     def _procesar_entrada(self):
-        """Procesa la entrada del usuario"""
+        """Procesa la entrada del usuario con un solo análisis por mensaje"""
         texto = self.entrada_usuario.get().strip()
         if not texto:
             return
@@ -138,16 +150,51 @@ class InterfazAgente:
         self.mostrar_mensaje(texto, "Tú 👤")
         self.entrada_usuario.delete(0, tk.END)
 
+        inicio = time.perf_counter()
+        analisis = analizar_mensaje(texto, PRESUPUESTO_ANALISIS_MS,
+                                    esperando_tiempo=self.estado_conversacion == "esperar_tiempo")
+        latencia_ms = (time.perf_counter() - inicio) * 1000
+        tiene_tiempo = analisis["tiempo"] is not None and analisis["minutos"] is not None
+
         if self.estado_conversacion == "esperar_animo":
-            self._procesar_animo(texto)
+            if analisis["es_saludo"] and not analisis["menciona_animo"] and not tiene_tiempo:
+                self.mostrar_mensaje("¡Hola de nuevo! ¿Cómo te sientes?")
+                return
+            if tiene_tiempo and not analisis["menciona_animo"]:
+                # Solo indicó el tiempo: recordarlo y preguntar por el ánimo
+                self.tiempo_pendiente = (analisis["tiempo"], analisis["minutos"])
+                self.mostrar_mensaje("¡Perfecto! ¿Y cómo te sientes?")
+                return
+            self._registrar_sombra(texto, analisis["estado_animo"], latencia_ms, analisis["nivel"])
+            if tiene_tiempo:
+                self.tiempo_pendiente = (analisis["tiempo"], analisis["minutos"])
+            self._aplicar_animo(analisis["estado_animo"], analisis["confianza"])
         elif self.estado_conversacion == "esperar_tiempo":
-            self._procesar_tiempo(texto)
+            if analisis["declara_animo"]:
+                # El usuario actualizó su estado de ánimo junto con el tiempo
+                self._registrar_sombra(texto, analisis["estado_animo"], latencia_ms, analisis["nivel"])
+                self.agente.estado_animo = analisis["estado_animo"]
+            self._aplicar_tiempo(analisis["tiempo"], analisis["minutos"])
+
+    def _registrar_sombra(self, texto: str, estado_animo: str, latencia_ms: float, nivel: str):
+        """Envía el mensaje a la evaluación en sombra, si está activa.
+
+        Se envían todas las respuestas con su nivel: el resumen mide el acuerdo
+        sobre todas y la latencia solo sobre las de nivel "completo".
+        """
+        if self.evaluador_sombra is not None:
+            self.evaluador_sombra.registrar(texto, estado_animo, latencia_ms, nivel)
 
     def _procesar_animo(self, texto: str):
         """Procesa la respuesta del estado de ánimo"""
-        from utils.procesador_lenguaje import obtener_descripcion_animo
-        estado_animo, descripcion, confianza = obtener_descripcion_animo(texto)
-        
+        from utils.procesador_lenguaje import analizar_animo_con_nivel
+        inicio = time.perf_counter()
+        nivel, (estado_animo, descripcion, confianza) = analizar_animo_con_nivel(texto, PRESUPUESTO_ANALISIS_MS)
+        self._registrar_sombra(texto, estado_animo, (time.perf_counter() - inicio) * 1000, nivel)
+        self._aplicar_animo(estado_animo, confianza)
+
+    def _aplicar_animo(self, estado_animo: str, confianza: float):
+        """Guarda el estado de ánimo detectado y continúa la conversación"""
         if not estado_animo:
             self.mostrar_mensaje("Disculpa, no pude entender bien cómo te sientes. ¿Podrías decirlo de otra forma?")
             self.mostrar_mensaje("Puedes decirme si te sientes motivado, normal, cansado, o describir tu estado en tus propias palabras.")
@@ -169,6 +216,14 @@ class InterfazAgente:
                 "normal": "Entiendo que te sientas así. ",
                 "cansado": "Comprendo que no estés en tu mejor momento. "
             }
+
+        # Si el tiempo ya se conoce, pasar directamente a las recomendaciones
+        if self.tiempo_pendiente is not None:
+            categoria, minutos = self.tiempo_pendiente
+            self.tiempo_pendiente = None
+            self.mostrar_mensaje(respuestas[estado_animo].strip())
+            self._aplicar_tiempo(categoria, minutos)
+            return
         
         self.mostrar_mensaje(f"{respuestas[estado_animo]}¿Cuánto tiempo tienes para estudiar?")
         
@@ -182,7 +237,10 @@ class InterfazAgente:
 
         # Obtener categoría (poco/medio/mucho), descripción y minutos totales
         categoria, descripcion, minutos = obtener_descripcion_tiempo(texto)
+        self._aplicar_tiempo(categoria, minutos)
 
+    def _aplicar_tiempo(self, categoria: str, minutos: int):
+        """Genera las recomendaciones para la categoría y minutos indicados"""
         if not categoria or minutos is None:
             self.mostrar_mensaje("Disculpa, no pude entender bien cuánto tiempo tienes. ¿Podrías decirlo de otra forma?")
             self.mostrar_mensaje("Puedes decirlo en minutos (ej: 30 minutos) o en horas (ej: 1:30, 2 horas)")
@@ -191,6 +249,10 @@ class InterfazAgente:
         if minutos > 24 * 60:  # Más de 24 horas
             self.mostrar_mensaje("¡Wow! Ese es mucho tiempo. Te sugiero dividirlo en sesiones más cortas para ser más efectivo.")
             self.mostrar_mensaje("¿Qué te parece si empezamos con una sesión más corta?")
+            # Asegurar que se pida el tiempo aunque se viniera de un mensaje combinado
+            self.estado_conversacion = "esperar_tiempo"
+            self.botones_animo.pack_forget()
+            self.botones_tiempo.pack(pady=5)
             return
 
         # Guardar categoría en el agente y obtener recomendaciones generales
@@ -219,7 +281,7 @@ class InterfazAgente:
 
         # Guardar en el historial
         registro = {
-            "fecha": datetime.now().strftime("%Y-%m-%d %H:%M"),
+            "fecha": datetime.now().strftime(FORMATO_FECHA_HISTORIAL),
             "estado_animo": self.agente.estado_animo,
             "tiempo": self.agente.tiempo_disponible,
             "recomendaciones": recomendaciones
@@ -256,15 +318,20 @@ class InterfazAgente:
                 with open(ruta, "r", encoding="utf-8") as f:
                     datos = json.load(f)
                     self.agente.historial = datos.get("historial", [])
+                    self.agente.resumen_diario = datos.get("resumen_diario", [])
         except Exception as e:
             print(f"Error al cargar datos: {e}")
             self.agente.historial = []
+            self.agente.resumen_diario = []
     
     def _guardar_datos(self):
         """Guarda los datos del agente en archivos"""
         try:
+            # Agrupar los registros antiguos antes de escribir el archivo
+            self.agente.aplicar_retencion()
             datos = {
-                "historial": self.agente.historial
+                "historial": self.agente.historial,
+                "resumen_diario": self.agente.resumen_diario
             }
             with open("datos_agente.json", "w", encoding="utf-8") as f:
                 json.dump(datos, f, ensure_ascii=False, indent=2)
@@ -273,4 +340,10 @@ class InterfazAgente:
 
     def iniciar(self):
         """Inicia la aplicación"""
-        self.ventana.mainloop()
\ No newline at end of file
+        try:
+            self.ventana.mainloop()
+        finally:
+            if self.evaluador_sombra is not None:
+                self.evaluador_sombra.cerrar()
+            guardar_estadisticas()
+            cerrar_cache()
\ No newline at end of file
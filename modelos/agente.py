@@ -2,14 +2,20 @@
 Clase principal del Agente de Estudio
 """
 from typing import List, Dict, Optional
+from datetime import datetime, timedelta
 import random
-from config.constantes import RECOMENDACIONES, TIPS_MOTIVACIONALES
+from config.constantes import (
+    RECOMENDACIONES, TIPS_MOTIVACIONALES, DIAS_RETENCION_HISTORIAL, FORMATO_FECHA_HISTORIAL
+)
 
 class AgenteEstudio:
     def __init__(self):
         self.estado_animo: Optional[str] = None
         self.tiempo_disponible: Optional[str] = None
         self.historial: List[Dict] = []
+        # Registros antiguos agrupados: {"fecha", "estado_animo", "tiempo", "sesiones"}
+        self.resumen_diario: List[Dict] = []
+        self.dias_retencion = DIAS_RETENCION_HISTORIAL
         self.recomendaciones = RECOMENDACIONES
         self.tips_motivacionales = TIPS_MOTIVACIONALES
         
@@ -25,23 +31,77 @@ class AgenteEstudio:
         """Agrega un nuevo registro al historial"""
         self.historial.append(registro)
         
+    def aplicar_retencion(self, ahora: Optional[datetime] = None) -> int:
+        """Agrupa en resúmenes diarios los registros fuera de la ventana de retención.
+
+        El historial se agrega en orden cronológico, así que solo se recorre
+        hasta el primer registro reciente. Retorna cuántos registros se agruparon.
+        """
+        limite = (ahora or datetime.now()) - timedelta(days=self.dias_retencion)
+
+        antiguos = 0
+        for registro in self.historial:
+            try:
+                fecha = datetime.strptime(registro.get("fecha", ""), FORMATO_FECHA_HISTORIAL)
+            except ValueError:
+                fecha = None  # Fechas ilegibles se agrupan como antiguas
+            if fecha is not None and fecha >= limite:
+                break
+            antiguos += 1
+
+        if not antiguos:
+            return 0
+
+        # Solo los resúmenes del último día agrupado pueden recibir más sesiones
+        primer_dia = self.historial[0].get("fecha", "")[:10]
+        indice = {}
+        for resumen in reversed(self.resumen_diario):
+            if resumen["fecha"] < primer_dia:
+                break
+            indice[(resumen["fecha"], resumen["estado_animo"], resumen["tiempo"])] = resumen
+
+        for registro in self.historial[:antiguos]:
+            clave = (registro.get("fecha", "")[:10] or "desconocida",
+                     registro["estado_animo"], registro["tiempo"])
+            if clave not in indice:
+                indice[clave] = {
+                    "fecha": clave[0],
+                    "estado_animo": clave[1],
+                    "tiempo": clave[2],
+                    "sesiones": 0
+                }
+                self.resumen_diario.append(indice[clave])
+            indice[clave]["sesiones"] += 1
+
+        del self.historial[:antiguos]
+        return antiguos
+        
     def obtener_estadisticas(self) -> Dict:
-        """Obtiene estadísticas del uso del agente"""
-        if not self.historial:
+        """Obtiene estadísticas del uso del agente (historial y resúmenes diarios)"""
+        if not self.historial and not self.resumen_diario:
             return {}
             
-        total_sesiones = len(self.historial)
+        total_sesiones = 0
         estados_animo = {}
         tiempos_estudio = {}
         
         for registro in self.historial:
             estado = registro["estado_animo"]
             tiempo = registro["tiempo"]
+            total_sesiones += 1
             estados_animo[estado] = estados_animo.get(estado, 0) + 1
             tiempos_estudio[tiempo] = tiempos_estudio.get(tiempo, 0) + 1
+
+        for resumen in self.resumen_diario:
+            estado = resumen["estado_animo"]
+            tiempo = resumen["tiempo"]
+            sesiones = resumen["sesiones"]
+            total_sesiones += sesiones
+            estados_animo[estado] = estados_animo.get(estado, 0) + sesiones
+            tiempos_estudio[tiempo] = tiempos_estudio.get(tiempo, 0) + sesiones
             
         return {
             "total_sesiones": total_sesiones,
             "estados_animo": estados_animo,
             "tiempos_estudio": tiempos_estudio
-        }
\ No newline at end of file
+        }
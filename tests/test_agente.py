@@ -1,3 +1,5 @@
+from datetime import datetime
+
 from modelos.agente import AgenteEstudio
 
 
@@ -13,3 +15,40 @@ def test_tip_aleatorio():
     tip = agente.obtener_tip_aleatorio()
     assert isinstance(tip, str)
     assert len(tip) > 0
+
+
+def _registro(fecha, estado, tiempo):
+    return {"fecha": fecha, "estado_animo": estado, "tiempo": tiempo, "recomendaciones": ["x"]}
+
+
+def test_retencion_agrupa_por_dia_y_conserva_estadisticas():
+    agente = AgenteEstudio()
+    agente.dias_retencion = 7
+    agente.historial = [
+        _registro("2025-01-01 10:00", "cansado", "poco"),
+        _registro("2025-01-01 18:00", "cansado", "poco"),
+        _registro("2025-01-02 09:00", "motivado", "mucho"),
+        _registro("2025-03-01 09:00", "normal", "medio"),
+    ]
+    antes = agente.obtener_estadisticas()
+
+    agrupados = agente.aplicar_retencion(ahora=datetime(2025, 3, 2))
+
+    assert agrupados == 3
+    assert [r["fecha"] for r in agente.historial] == ["2025-03-01 09:00"]
+    assert {"fecha": "2025-01-01", "estado_animo": "cansado", "tiempo": "poco", "sesiones": 2} in agente.resumen_diario
+    assert agente.obtener_estadisticas() == antes
+
+
+def test_retencion_incremental_acumula_en_el_mismo_dia():
+    agente = AgenteEstudio()
+    agente.dias_retencion = 1
+    agente.historial = [_registro("2025-01-01 10:00", "normal", "poco")]
+    agente.aplicar_retencion(ahora=datetime(2025, 1, 3))
+    agente.historial = [_registro("2025-01-01 20:00", "normal", "poco")]
+    agente.aplicar_retencion(ahora=datetime(2025, 1, 3))
+
+    assert agente.resumen_diario == [
+        {"fecha": "2025-01-01", "estado_animo": "normal", "tiempo": "poco", "sesiones": 2}
+    ]
+    assert agente.aplicar_retencion(ahora=datetime(2025, 1, 3)) == 0
@@ -0,0 +1,78 @@
+from utils.cache_analisis import (
+    CacheAnalisis, cacheado, calcular_version, iniciar_cache, cerrar_cache, obtener_cache
+)
+from utils.motores import establecer_motor
+from utils.motores.lexico import MotorLexico
+
+
+def test_guardar_y_obtener_entre_instancias(tmp_path):
+    ruta = str(tmp_path / "cache.sqlite3")
+    cache = CacheAnalisis(ruta, "v1")
+    cache.guardar("animo", "Estoy  CANSADO", ["cansado", "desc", 0.5])
+    cache.cerrar()
+
+    # Una nueva instancia (p. ej. tras reiniciar) precarga la entrada en memoria
+    cache = CacheAnalisis(ruta, "v1")
+    assert cache.precargar() == 1
+    assert cache.obtener("animo", "estoy cansado") == ["cansado", "desc", 0.5]
+    assert cache.obtener("tiempo", "estoy cansado") is None
+
+
+def test_cambio_de_version_invalida_entradas(tmp_path):
+    ruta = str(tmp_path / "cache.sqlite3")
+    CacheAnalisis(ruta, "v1").guardar("animo", "hola", ["normal", "d", 0.5])
+    cache = CacheAnalisis(ruta, "v2")
+    assert cache.obtener("animo", "hola") is None
+
+
+def test_versiones_distintas_comparten_el_archivo(tmp_path):
+    ruta = str(tmp_path / "cache.sqlite3")
+    v1 = CacheAnalisis(ruta, "v1")
+    v1.guardar("animo", "hola", ["normal", "d", 0.5])
+    # Abrir la caché con otra configuración no borra las entradas de la primera
+    CacheAnalisis(ruta, "v2").guardar("animo", "hola", ["motivado", "d", 0.9])
+    assert CacheAnalisis(ruta, "v1").obtener("animo", "hola") == ["normal", "d", 0.5]
+
+
+def test_obtener_retorna_una_copia(tmp_path):
+    cache = CacheAnalisis(str(tmp_path / "cache.sqlite3"), "v1")
+    cache.guardar("mensaje", "hola", {"es_saludo": True})
+    cache.obtener("mensaje", "hola")["es_saludo"] = False
+    assert cache.obtener("mensaje", "hola") == {"es_saludo": True}
+
+
+def test_version_sigue_al_motor_creado(tmp_path):
+    iniciar_cache(str(tmp_path / "cache.sqlite3"))
+    try:
+        obtener_cache().actualizar_version(calcular_version("spacy"))
+        establecer_motor(MotorLexico())
+        assert obtener_cache().version == calcular_version("lexico")
+    finally:
+        establecer_motor(None)
+        cerrar_cache()
+
+
+def test_desalojo_por_tamano(tmp_path):
+    cache = CacheAnalisis(str(tmp_path / "cache.sqlite3"), "v1", max_entradas=3, max_memoria=1)
+    for i in range(5):
+        cache.guardar("tiempo", f"{i} minutos", ["poco", "d", i])
+    cache.mantener()
+    assert cache.obtener("tiempo", "0 minutos") is None
+    assert cache.obtener("tiempo", "4 minutos") == ["poco", "d", 4]
+
+
+def test_decorador_usa_la_cache(tmp_path):
+    llamadas = []
+
+    @cacheado("prueba")
+    def analizar(texto):
+        llamadas.append(texto)
+        return ("normal", texto, 0.5)
+
+    iniciar_cache(str(tmp_path / "cache.sqlite3"))
+    try:
+        assert analizar("Hola") == ("normal", "Hola", 0.5)
+        assert analizar("hola") == ("normal", "Hola", 0.5)
+        assert llamadas == ["Hola"]
+    finally:
+        cerrar_cache()
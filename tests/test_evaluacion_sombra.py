@@ -0,0 +1,110 @@
+import threading
+import time
+
+from utils.evaluacion_sombra import EvaluadorSombra, resumir_log, formatear_resumen
+
+
+def test_registra_acuerdo_y_latencias(tmp_path):
+    ruta = tmp_path / "sombra.jsonl"
+    evaluador = EvaluadorSombra(lambda texto: "cansado" if "cansado" in texto else "normal", str(ruta))
+    evaluador.registrar("estoy cansado", "cansado", 12.0)
+    evaluador.registrar("me siento genial", "motivado", 8.0)
+    evaluador.esperar()
+
+    resumen = resumir_log(str(ruta))
+    assert resumen["total"] == 2
+    assert resumen["coincidencias"] == 1
+    assert resumen["desacuerdos"] == {"motivado -> normal": 1}
+    assert resumen["latencia_principal"]["media_ms"] == 10.0
+    assert "Acuerdo: 1/2" in formatear_resumen(resumen)
+
+
+def test_errores_del_motor_no_se_propagan(tmp_path):
+    def motor_roto(texto):
+        raise RuntimeError("fallo")
+
+    ruta = tmp_path / "sombra.jsonl"
+    evaluador = EvaluadorSombra(motor_roto, str(ruta))
+    evaluador.registrar("hola", "normal", 1.0)
+    evaluador.esperar()
+
+    resumen = resumir_log(str(ruta))
+    assert resumen["errores"] == 1
+    assert resumen["coincidencias"] == 0
+
+
+def test_resumen_sin_log(tmp_path):
+    assert resumir_log(str(tmp_path / "no_existe.jsonl")) == {}
+
+
+def test_descartes_se_registran_en_el_log(tmp_path):
+    iniciado, liberar = threading.Event(), threading.Event()
+
+    def motor_lento(texto):
+        iniciado.set()
+        liberar.wait(5)
+        return "normal"
+
+    ruta = tmp_path / "sombra.jsonl"
+    evaluador = EvaluadorSombra(motor_lento, str(ruta), max_pendientes=1)
+    evaluador.registrar("uno", "normal", 1.0)
+    iniciado.wait(5)
+    evaluador.registrar("dos", "normal", 1.0)
+    evaluador.registrar("tres", "normal", 1.0)
+    evaluador.registrar("cuatro", "normal", 1.0)
+    liberar.set()
+    evaluador.cerrar()
+
+    resumen = resumir_log(str(ruta))
+    assert evaluador.descartados == 2
+    assert resumen["total"] == 2
+    assert resumen["descartados"] == 2
+    assert resumen["cobertura"] == 0.5
+    assert "descartados por cola llena: 2" in formatear_resumen(resumen)
+
+
+def test_motor_en_subproceso(tmp_path):
+    ruta = tmp_path / "sombra.jsonl"
+    evaluador = EvaluadorSombra("os.path:normcase", str(ruta), en_subproceso=True)
+    evaluador.registrar("normal", "normal", 1.0)
+    evaluador.cerrar()
+
+    resumen = resumir_log(str(ruta))
+    assert resumen["coincidencias"] == 1
+    assert resumen["descartados"] == 0
+
+
+def test_cerrar_respeta_el_plazo(tmp_path):
+    liberar = threading.Event()
+
+    def motor_bloqueado(texto):
+        liberar.wait(5)
+        return "normal"
+
+    ruta = tmp_path / "sombra.jsonl"
+    evaluador = EvaluadorSombra(motor_bloqueado, str(ruta), max_pendientes=5)
+    for texto in ("uno", "dos", "tres"):
+        evaluador.registrar(texto, "normal", 1.0)
+    inicio = time.monotonic()
+    evaluador.cerrar(plazo_s=0.1)
+    assert time.monotonic() - inicio < 1
+    liberar.set()
+
+    # El mensaje en curso no cuenta; los dos que seguían en la cola sí
+    assert evaluador.descartados == 2
+    assert resumir_log(str(ruta))["descartados"] == 2
+
+
+def test_acuerdo_sobre_todos_los_niveles_y_latencia_solo_completos(tmp_path):
+    ruta = tmp_path / "sombra.jsonl"
+    evaluador = EvaluadorSombra(lambda texto: "cansado", str(ruta))
+    evaluador.registrar("estoy cansado", "cansado", 20.0, "completo")
+    evaluador.registrar("estoy cansado", "cansado", 0.1, "cache")
+    evaluador.registrar("muy cansado", "normal", 1.0, "neutral")
+    evaluador.esperar()
+
+    resumen = resumir_log(str(ruta))
+    assert resumen["total"] == 3
+    assert resumen["coincidencias"] == 2
+    assert resumen["niveles"] == {"completo": 1, "cache": 1, "neutral": 1}
+    assert resumen["latencia_principal"]["media_ms"] == 20.0
@@ -0,0 +1,40 @@
+import pytest
+
+from utils.motores import crear_motor, diagnosticar_spacy
+from utils.motores.base import MotorAnalisis
+from utils.procesador_lenguaje import tiene_negacion
+
+
+def test_motor_lexico_tokeniza():
+    motor = crear_motor("lexico")
+    doc = motor.procesar("Hola, ¡estoy MUY cansado!")
+    assert [t.text for t in doc] == ["hola", "estoy", "muy", "cansado"]
+    assert doc[1].lemma_ == "estar"
+    assert doc[2].i == 2
+
+
+def test_motor_lexico_negacion():
+    motor = crear_motor("lexico")
+    assert tiene_negacion(motor.procesar("no estoy motivado"))
+    assert tiene_negacion(motor.procesar("ya no"))
+    assert not tiene_negacion(motor.procesar("estoy motivado"))
+
+
+def test_motor_lexico_polaridad():
+    motor = crear_motor("lexico")
+    assert motor.polaridad("feliz y con ganas") > 0
+    assert motor.polaridad("cansado y agotado") < 0
+    assert motor.polaridad("una mesa") == 0
+
+
+def test_diagnosticar_spacy_retorna_valor_conocido():
+    assert diagnosticar_spacy() in (None, "libreria", "modelo")
+
+
+def test_motor_incompleto_no_se_puede_crear():
+    class MotorIncompleto(MotorAnalisis):
+        def procesar(self, texto):
+            return []
+
+    with pytest.raises(TypeError):
+        MotorIncompleto()
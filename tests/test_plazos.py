@@ -0,0 +1,96 @@
+import threading
+import time
+
+from utils.cache_analisis import cacheado, iniciar_cache, cerrar_cache, consultar_cache
+from utils import plazos
+from utils.plazos import calentar_motor, ejecutar_con_plazo, estadisticas_degradacion, reiniciar_estadisticas
+from utils.procesador_lenguaje import analizar_animo_con_nivel, analizar_mensaje, obtener_descripcion_animo
+
+
+def _alternativa(texto):
+    return "neutral", ("normal", "reducido", 0.0)
+
+
+def _esperar_cache(funcion, texto):
+    limite = time.monotonic() + 5
+    while time.monotonic() < limite:
+        guardado = consultar_cache(funcion, texto)
+        if guardado is not None:
+            return guardado
+        time.sleep(0.01)
+    return None
+
+
+def test_responde_con_alternativa_si_se_agota_el_plazo(tmp_path):
+    liberar = threading.Event()
+    llamadas = []
+
+    @cacheado("lento")
+    def lento(texto):
+        llamadas.append(texto)
+        liberar.wait(5)
+        return ("cansado", "completo", 0.9)
+
+    reiniciar_estadisticas()
+    iniciar_cache(str(tmp_path / "cache.sqlite3"))
+    try:
+        assert ejecutar_con_plazo(lento, "lento", "hola", 10, _alternativa) == (
+            "neutral", ("normal", "reducido", 0.0))
+        # El mismo texto espera al análisis en curso en lugar de lanzar otro
+        assert ejecutar_con_plazo(lento, "lento", "Hola", 10, _alternativa)[0] == "neutral"
+        # Con el hilo ocupado más allá del plazo, otro texto no se encola
+        assert ejecutar_con_plazo(lento, "lento", "adiós", 1000, _alternativa)[0] == "neutral"
+
+        # El resultado tardío sigue actualizando la caché
+        liberar.set()
+        assert _esperar_cache("lento", "hola") == ("cansado", "completo", 0.9)
+        assert ejecutar_con_plazo(lento, "lento", "hola", 10, _alternativa) == (
+            "cache", ("cansado", "completo", 0.9))
+        assert llamadas == ["hola"]
+    finally:
+        cerrar_cache()
+
+    estadisticas = estadisticas_degradacion()
+    assert estadisticas["niveles"]["neutral"] == 3
+    assert estadisticas["niveles"]["cache"] == 1
+    assert estadisticas["proporcion_degradada"] == 3 / 4
+
+
+def test_responde_tras_calentar_motor():
+    calentar_motor().result(timeout=30)
+    nivel, (estado, descripcion, confianza) = analizar_animo_con_nivel("ando muy cansado hoy", 5000)
+    assert nivel == "completo"
+    assert estado == "cansado"
+
+
+def test_obtener_descripcion_animo_con_presupuesto_amplio():
+    estado, descripcion, confianza = obtener_descripcion_animo("estoy muy cansado", presupuesto_ms=5000)
+    assert estado == "cansado"
+    assert "reducido" not in descripcion
+
+
+def test_registro_de_degradacion(tmp_path, monkeypatch):
+    ruta = tmp_path / "degradacion.jsonl"
+    monkeypatch.setattr(plazos, "_ruta_registro", str(ruta))
+    reiniciar_estadisticas()
+    for i in range(3):
+        ejecutar_con_plazo(lambda t: t, "sin_cache", f"texto {i}", 5000, _alternativa)
+    plazos.guardar_estadisticas()
+    # Sin conteos nuevos no se añade otra línea
+    plazos.guardar_estadisticas()
+
+    assert len(ruta.read_text(encoding="utf-8").splitlines()) == 1
+    resumen = plazos.resumir_registro(str(ruta))
+    assert resumen["niveles"]["completo"] == 3
+    assert resumen["proporcion_degradada"] == 0.0
+
+
+def test_nivel_distingue_cache_de_analisis_completo(tmp_path):
+    iniciar_cache(str(tmp_path / "cache.sqlite3"))
+    try:
+        assert analizar_mensaje("estoy cansado", 5000)["nivel"] == "completo"
+        assert analizar_mensaje("estoy cansado", 5000)["nivel"] == "cache"
+        assert analizar_animo_con_nivel("estoy feliz")[0] == "completo"
+        assert analizar_animo_con_nivel("estoy feliz")[0] == "cache"
+    finally:
+        cerrar_cache()
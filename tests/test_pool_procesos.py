@@ -0,0 +1,87 @@
+import os
+import signal
+import sys
+import time
+
+import pytest
+
+pytestmark = pytest.mark.skipif(not sys.platform.startswith("linux"), reason="requiere fork y /proc")
+
+from utils.pool_procesos import ServidorPrefork, consultar, _esperar_pool, _pids_trabajadores
+
+
+@pytest.fixture
+def pool(tmp_path):
+    ruta = str(tmp_path / "pool.sock")
+    pid = os.fork()
+    if pid == 0:
+        try:
+            ServidorPrefork(ruta, trabajadores=2, max_peticiones=3, usar_cache=False).servir()
+        finally:
+            os._exit(0)
+    try:
+        _esperar_pool(ruta, limite_s=30)
+        yield ruta, pid
+    finally:
+        os.kill(pid, signal.SIGTERM)
+        os.waitpid(pid, 0)
+
+
+def test_pool_responde_analisis(pool):
+    ruta, _ = pool
+    estado, descripcion, minutos = consultar("tiempo", "30 minutos", ruta)
+    assert (estado, minutos) == ("poco", 30)
+    assert consultar("mensaje", "estoy cansado y tengo 2 horas", ruta)["tiempo"] == "mucho"
+    with pytest.raises(RuntimeError):
+        consultar("desconocida", "hola", ruta)
+    assert consultar("estado", ruta_socket=ruta)["degradacion"]["total"] == 0
+
+
+def test_pool_reemplaza_trabajadores(pool):
+    ruta, pid_padre = pool
+    iniciales = set(_pids_trabajadores(pid_padre))
+    assert len(iniciales) == 2
+
+    # Un trabajador caído se reemplaza
+    os.kill(next(iter(iniciales)), signal.SIGKILL)
+    # Y los que alcanzan el máximo de peticiones también
+    for _ in range(10):
+        assert consultar("tiempo", "1 hora", ruta)[0] == "medio"
+
+    # El reemplazo de un trabajador caído al iniciar espera VIDA_MINIMA_S
+    fin = time.monotonic() + 5
+    actuales = set(_pids_trabajadores(pid_padre))
+    while len(actuales) < 2 and time.monotonic() < fin:
+        time.sleep(0.1)
+        actuales = set(_pids_trabajadores(pid_padre))
+    assert len(actuales) == 2
+    assert actuales != iniciales
+
+
+def test_preparar_calienta_el_motor_aunque_la_cache_tenga_las_frases(tmp_path, monkeypatch):
+    from config import constantes
+    from utils import cache_analisis, plazos
+    from utils.motores import establecer_motor
+    from utils.motores.lexico import MotorLexico
+
+    class MotorContado(MotorLexico):
+        llamadas = 0
+
+        def procesar(self, texto):
+            MotorContado.llamadas += 1
+            return super().procesar(texto)
+
+    monkeypatch.setattr(constantes, "RUTA_CACHE_ANALISIS", str(tmp_path / "cache.sqlite3"))
+    monkeypatch.setattr(constantes, "RUTA_LOG_DEGRADACION", str(tmp_path / "degradacion.jsonl"))
+    monkeypatch.setattr(plazos, "_ruta_registro", None)
+    establecer_motor(MotorContado())
+    try:
+        for _ in range(2):
+            MotorContado.llamadas = 0
+            ServidorPrefork(str(tmp_path / "pool.sock"), trabajadores=1).preparar()
+            cache_analisis.cerrar_cache()
+            assert MotorContado.llamadas > 0
+    finally:
+        import gc
+        gc.unfreeze()
+        establecer_motor(None)
@@ -1,6 +1,8 @@
 import pytest
 
-from utils.procesador_lenguaje import obtener_descripcion_tiempo, analizar_estado_animo
+from utils.procesador_lenguaje import (
+    obtener_descripcion_tiempo, analizar_estado_animo, obtener_descripcion_animo, analizar_mensaje
+)
 
 
 @pytest.mark.parametrize("texto,esperado_cat,esperado_minutos", [
@@ -18,8 +20,87 @@ def test_obtener_descripcion_tiempo(texto, esperado_cat, esperado_minutos):
 
 def test_analizar_estado_animo_basico():
     # Casos simples que no requieren modelo sofisticado
-    estado, desc, conf = analizar_estado_animo("Me siento muy feliz y con muchas ganas de estudiar")
-    assert estado in ("motivado", "normal")
+    assert analizar_estado_animo("Me siento muy feliz y con muchas ganas de estudiar") in ("motivado", "normal")
+    assert analizar_estado_animo("Estoy cansado y sin energía") in ("cansado", "normal")
 
-    estado2, desc2, conf2 = analizar_estado_animo("Estoy cansado y sin energía")
-    assert estado2 in ("cansado", "normal")
+
+def test_obtener_descripcion_animo():
+    estado, desc, conf = obtener_descripcion_animo("Estoy cansado y sin energía")
+    assert estado in ("cansado", "normal")
+    assert estado in desc
+    assert 0.0 <= conf <= 1.0
+
+
+def test_analizar_mensaje_animo_y_tiempo():
+    analisis = analizar_mensaje("Hola, estoy cansado y tengo 30 minutos")
+    assert analisis["es_saludo"]
+    assert analisis["menciona_animo"]
+    assert analisis["estado_animo"] == "cansado"
+    assert analisis["tiempo"] == "poco"
+    assert analisis["minutos"] == 30
+
+
+def test_analizar_mensaje_sin_tiempo():
+    analisis = analizar_mensaje("me siento un poco cansado")
+    assert analisis["menciona_animo"]
+    assert analisis["tiempo"] is None
+    assert analisis["minutos"] is None
+
+
+def test_analizar_mensaje_solo_tiempo():
+    analisis = analizar_mensaje("tengo 2 horas")
+    assert not analisis["menciona_animo"]
+    assert analisis["tiempo"] == "mucho"
+    assert analisis["minutos"] == 120
+
+
+def test_analizar_mensaje_tiempo_sin_cifras_al_esperar_tiempo():
+    assert analizar_mensaje("poco")["tiempo"] is None
+    analisis = analizar_mensaje("poco", esperando_tiempo=True)
+    assert analisis["tiempo"] == "poco"
+    assert analisis["minutos"] == 25
+    assert analizar_mensaje("bastante", esperando_tiempo=True)["tiempo"] == "mucho"
+
+
+@pytest.mark.parametrize("texto", [
+    "me siento un poco cansado pero tengo tiempo",
+    "estoy bastante cansado, tengo tiempo",
+    "estoy muy cansado y no tengo mucho tiempo",
+    "tengo 20 años y estoy cansado",
+])
+def test_analizar_mensaje_sin_duracion_explicita(texto):
+    analisis = analizar_mensaje(texto)
+    assert analisis["tiempo"] is None
+    assert analisis["minutos"] is None
+
+
+@pytest.mark.parametrize("texto,esperado_minutos", [
+    ("tengo una hora", 60),
+    ("media hora", 30),
+    ("una hora y media", 90),
+    ("1:30", 90),
+])
+def test_analizar_mensaje_duraciones_explicitas(texto, esperado_minutos):
+    assert analizar_mensaje(texto)["minutos"] == esperado_minutos
+
+
+def test_esperando_tiempo_ignora_intensificadores_y_negaciones():
+    assert analizar_mensaje("me siento un poco cansado", esperando_tiempo=True)["tiempo"] is None
+    assert analizar_mensaje("estoy regular", esperando_tiempo=True)["tiempo"] is None
+    assert analizar_mensaje("estoy muy cansado y no tengo mucho tiempo", esperando_tiempo=True)["tiempo"] == "poco"
+    assert analizar_mensaje("45", esperando_tiempo=True)["minutos"] == 45
+
+
+def test_declara_animo_solo_con_verbo_y_palabra_clave():
+    assert not analizar_mensaje("ok, 30 minutos", esperando_tiempo=True)["declara_animo"]
+    analisis = analizar_mensaje("bien, tengo una hora", esperando_tiempo=True)
+    assert not analisis["declara_animo"]
+    assert analisis["minutos"] == 60
+    assert analizar_mensaje("ahora me siento motivado, tengo 2 horas")["declara_animo"]
+
+
+def test_saludo_con_segunda_persona_no_menciona_animo():
+    analisis = analizar_mensaje("hola, ¿cómo estás?")
+    assert analisis["es_saludo"]
+    assert not analisis["menciona_animo"]
+    assert not analisis["declara_animo"]
@@ -0,0 +1,16 @@
+import sys
+
+import pytest
+
+from config.constantes import ESTADOS_ANIMO_KEYWORDS
+from utils.vectores import CORPUS_ANIMO, rss_mb
+
+
+def test_corpus_animo_usa_estados_conocidos():
+    assert len(CORPUS_ANIMO) > 0
+    assert {estado for _, estado in CORPUS_ANIMO} == set(ESTADOS_ANIMO_KEYWORDS)
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="requiere /proc")
+def test_rss_mb_positivo():
+    assert rss_mb() > 0
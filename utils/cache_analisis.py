@@ -0,0 +1,294 @@
+"""
+Caché persistente de resultados de análisis.
+
+Guarda en SQLite los resultados de `obtener_descripcion_animo`,
+`obtener_descripcion_tiempo` y `analizar_mensaje`, con el texto normalizado
+como clave. Cada entrada lleva la versión del análisis (motor, modelo,
+`config.constantes`, el procesador y el código de los motores); al cambiar
+cualquiera de ellos las entradas antiguas dejan de usarse y acaban saliendo
+por antigüedad. Las entradas de otras versiones no se borran al abrir la
+caché, para que procesos con configuraciones distintas puedan compartirla.
+La versión se recalcula con el motor realmente creado (en modo "auto" puede
+no ser el previsto).
+
+- Al iniciar, las entradas más usadas se cargan en memoria, de modo que las
+  frases frecuentes se responden sin cargar spaCy.
+- Varios procesos pueden compartir el archivo: se usa el modo WAL de SQLite y
+  cada proceso abre su propia conexión (también tras un fork).
+- Cuando el número de entradas supera `CACHE_MAX_ENTRADAS` se eliminan las
+  usadas hace más tiempo.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from importlib import metadata
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from config import constantes
+from utils.motores import MotorAnalisis, al_crear_motor, nombre_motor_configurado
+
+# Cada cuántas escrituras se revisa el tamaño o se registran los usos en memoria
+INTERVALO_MANTENIMIENTO = 100
+
+
+def normalizar_clave(texto: str) -> str:
+    """Normaliza el texto para usarlo como clave (minúsculas y espacios simples)"""
+    return re.sub(r"\s+", " ", texto.lower()).strip()
+
+
+def _version_modelo(motor: str) -> str:
+    if motor != "spacy":
+        return ""
+    if constantes.RUTA_MODELO_REDUCIDO:
+        info = Path(constantes.RUTA_MODELO_REDUCIDO) / "reduccion.json"
+        return info.read_text(encoding="utf-8") if info.exists() else constantes.RUTA_MODELO_REDUCIDO
+    for paquete in ("es_core_news_md", "es_core_news_sm"):
+        try:
+            return f"{paquete}=={metadata.version(paquete)}"
+        except metadata.PackageNotFoundError:
+            continue
+    return ""
+
+
+def calcular_version(motor: Optional[str] = None) -> str:
+    """Hash que identifica el motor, el modelo, las constantes y el código de análisis.
+
+    Sin `motor` se usa el motor activo o, si aún no se ha creado, el previsto.
+    """
+    motor = motor or nombre_motor_configurado()
+    h = hashlib.sha256()
+    h.update(motor.encode("utf-8"))
+    h.update(_version_modelo(motor).encode("utf-8"))
+    raiz = Path(__file__).resolve().parent.parent
+    archivos = [raiz / "config" / "constantes.py", raiz / "utils" / "procesador_lenguaje.py",
+                raiz / "utils" / "vectores.py"]
+    archivos += sorted((raiz / "utils" / "motores").glob("*.py"))
+    for archivo in archivos:
+        h.update(archivo.name.encode("utf-8"))
+        h.update(archivo.read_bytes())
+    return h.hexdigest()[:16]
+
+
+class CacheAnalisis:
+    """Caché de dos niveles: diccionario en memoria respaldado por SQLite"""
+
+    def __init__(self, ruta: str, version: str, max_entradas: int = constantes.CACHE_MAX_ENTRADAS,
+                 max_memoria: int = constantes.CACHE_PRECARGA):
+        self.ruta = ruta
+        self.version = version
+        self.max_entradas = max_entradas
+        self.max_memoria = max_memoria
+        # Los valores se guardan serializados: cada consulta retorna una copia nueva
+        self._memoria: "OrderedDict[str, str]" = OrderedDict()
+        self._usos_pendientes = set()
+        self._escrituras = 0
+        self._lock = threading.RLock()
+        self._conexion_pid: Optional[int] = None
+        self._conexion_actual: Optional[sqlite3.Connection] = None
+
+        with self._lock:
+            conexion = self._conexion()
+            conexion.execute(
+                "CREATE TABLE IF NOT EXISTS resultados ("
+                " version TEXT NOT NULL,"
+                " clave TEXT NOT NULL,"
+                " valor TEXT NOT NULL,"
+                " accesos INTEGER NOT NULL DEFAULT 1,"
+                " ultimo_uso REAL NOT NULL,"
+                " PRIMARY KEY (version, clave))"
+            )
+            conexion.execute("CREATE INDEX IF NOT EXISTS resultados_uso ON resultados (ultimo_uso)")
+
+    def _conexion(self) -> sqlite3.Connection:
+        """Conexión propia del proceso actual (se reabre tras un fork)"""
+        if self._conexion_actual is None or self._conexion_pid != os.getpid():
+            conexion = sqlite3.connect(self.ruta, timeout=10, isolation_level=None,
+                                       check_same_thread=False)
+            conexion.execute("PRAGMA journal_mode=WAL")
+            conexion.execute("PRAGMA synchronous=NORMAL")
+            self._conexion_actual = conexion
+            self._conexion_pid = os.getpid()
+        return self._conexion_actual
+
+    def actualizar_version(self, version: str) -> None:
+        """Cambia la versión en uso y descarta lo cargado en memoria de la anterior"""
+        with self._lock:
+            if version == self.version:
+                return
+            self.mantener()
+            self.version = version
+            self._memoria.clear()
+
+    @staticmethod
+    def _clave(funcion: str, texto: str) -> str:
+        return f"{funcion}:{normalizar_clave(texto)}"
+
+    def precargar(self) -> int:
+        """Carga en memoria las entradas más usadas; retorna cuántas se cargaron"""
+        with self._lock:
+            filas = self._conexion().execute(
+                "SELECT clave, valor FROM resultados WHERE version = ? "
+                "ORDER BY accesos DESC, ultimo_uso DESC LIMIT ?",
+                (self.version, self.max_memoria),
+            ).fetchall()
+            for clave, valor in reversed(filas):
+                self._memoria[clave] = valor
+            return len(filas)
+
+    def obtener(self, funcion: str, texto: str) -> Optional[Any]:
+        """Retorna el resultado guardado, o None si no está en la caché"""
+        clave = self._clave(funcion, texto)
+        with self._lock:
+            if clave in self._memoria:
+                self._memoria.move_to_end(clave)
+                self._usos_pendientes.add((self.version, clave))
+                return json.loads(self._memoria[clave])
+
+            fila = self._conexion().execute(
+                "SELECT valor FROM resultados WHERE version = ? AND clave = ?",
+                (self.version, clave),
+            ).fetchone()
+            if fila is None:
+                return None
+            self._usos_pendientes.add((self.version, clave))
+            self._recordar(clave, fila[0])
+            return json.loads(fila[0])
+
+    def guardar(self, funcion: str, texto: str, valor: Any) -> None:
+        """Guarda un resultado en memoria y en disco"""
+        clave = self._clave(funcion, texto)
+        serializado = json.dumps(valor, ensure_ascii=False)
+        with self._lock:
+            self._recordar(clave, serializado)
+            self._conexion().execute(
+                "INSERT INTO resultados (version, clave, valor, accesos, ultimo_uso) VALUES (?, ?, ?, 1, ?) "
+                "ON CONFLICT(version, clave) DO UPDATE SET valor = excluded.valor, "
+                "ultimo_uso = excluded.ultimo_uso",
+                (self.version, clave, serializado, time.time()),
+            )
+            self._escrituras += 1
+            if self._escrituras % INTERVALO_MANTENIMIENTO == 0:
+                self.mantener()
+
+    def _recordar(self, clave: str, valor: str) -> None:
+        self._memoria[clave] = valor
+        self._memoria.move_to_end(clave)
+        while len(self._memoria) > self.max_memoria:
+            self._memoria.popitem(last=False)
+
+    def mantener(self) -> None:
+        """Registra los usos pendientes y elimina las entradas que sobran"""
+        with self._lock:
+            conexion = self._conexion()
+            if self._usos_pendientes:
+                ahora = time.time()
+                conexion.executemany(
+                    "UPDATE resultados SET accesos = accesos + 1, ultimo_uso = ? WHERE version = ? AND clave = ?",
+                    [(ahora, version, clave) for version, clave in self._usos_pendientes],
+                )
+                self._usos_pendientes.clear()
+            # Las entradas de versiones que ya nadie usa son las primeras en salir
+            total = conexion.execute("SELECT COUNT(*) FROM resultados").fetchone()[0]
+            if total > self.max_entradas:
+                conexion.execute(
+                    "DELETE FROM resultados WHERE rowid IN ("
+                    " SELECT rowid FROM resultados ORDER BY ultimo_uso ASC LIMIT ?)",
+                    (total - self.max_entradas,),
+                )
+
+    def cerrar(self) -> None:
+        with self._lock:
+            if self._conexion_actual is not None and self._conexion_pid == os.getpid():
+                self.mantener()
+                self._conexion_actual.close()
+            self._conexion_actual = None
+
+
+_cache: Optional[CacheAnalisis] = None
+
+
+def iniciar_cache(ruta: Optional[str] = None) -> Optional[CacheAnalisis]:
+    """Abre la caché configurada y precarga en memoria sus entradas más usadas.
+
+    Sin llamar a esta función los resultados no se guardan (p. ej. en pruebas).
+    """
+    global _cache
+    ruta = ruta or constantes.RUTA_CACHE_ANALISIS
+    if not ruta:
+        return None
+    try:
+        _cache = CacheAnalisis(ruta, calcular_version())
+        _cache.precargar()
+    except sqlite3.Error as e:
+        print(f"No se pudo abrir la caché de análisis: {e}")
+        _cache = None
+    return _cache
+
+
+def _al_crear_motor(motor: MotorAnalisis) -> None:
+    """Ajusta la versión de la caché al motor realmente creado"""
+    cache = _cache
+    if cache is not None:
+        cache.actualizar_version(calcular_version(motor.nombre))
+
+
+al_crear_motor(_al_crear_motor)
+
+
+def obtener_cache() -> Optional[CacheAnalisis]:
+    """Retorna la caché activa, o None si no se ha iniciado"""
+    return _cache
+
+
+def cerrar_cache() -> None:
+    global _cache
+    if _cache is not None:
+        _cache.cerrar()
+    _cache = None
+
+
+def consultar_cache(funcion: str, texto: str) -> Optional[Any]:
+    """Busca un resultado en la caché activa sin ejecutar el análisis.
+
+    Retorna None si la caché no está iniciada o no tiene el resultado.
+    """
+    cache = _cache
+    if cache is None:
+        return None
+    try:
+        guardado = cache.obtener(funcion, texto)
+    except sqlite3.Error:
+        return None
+    return tuple(guardado) if isinstance(guardado, list) else guardado
+
+
+def cacheado(funcion: str) -> Callable:
+    """Decorador que consulta la caché activa antes de ejecutar el análisis.
+
+    Los resultados deben ser serializables en JSON; las tuplas se guardan como
+    listas y se devuelven de nuevo como tuplas.
+    """
+    def decorador(fn: Callable) -> Callable:
+        @wraps(fn)
+        def envoltura(texto: str, *args, **kwargs):
+            cache = _cache
+            if cache is None:
+                return fn(texto, *args, **kwargs)
+            guardado = consultar_cache(funcion, texto)
+            if guardado is not None:
+                return guardado
+            resultado = fn(texto, *args, **kwargs)
+            try:
+                cache.guardar(funcion, texto, list(resultado) if isinstance(resultado, tuple) else resultado)
+            except sqlite3.Error as e:
+                print(f"Error al guardar en la caché de análisis: {e}")
+            return resultado
+        return envoltura
+    return decorador
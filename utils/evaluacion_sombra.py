@@ -0,0 +1,313 @@
+"""
+Evaluación en sombra de un motor alternativo de estado de ánimo.
+
+Cada mensaje analizado por el motor principal se envía también, fuera del
+camino crítico, a un motor secundario. Un hilo en segundo plano ejecuta el
+motor secundario y guarda en un log local (JSON Lines) si ambos coinciden y
+la latencia de cada uno. La respuesta mostrada al usuario no cambia.
+
+La latencia principal que registra la interfaz cubre el análisis de todo el
+mensaje (`analizar_mensaje`: saludo, tiempo, intensidad y la espera al hilo
+de análisis), no solo el estado de ánimo; si el motor en sombra solo calcula
+el ánimo, `ahorro_medio_ms` sobreestima el ahorro real.
+
+Cada registro guarda el nivel de la respuesta principal (ver `utils.plazos`).
+El acuerdo se calcula sobre todas las respuestas, incluidas las de la caché y
+las degradadas; las latencias, solo sobre las de nivel "completo", las únicas
+en las que el motor principal analizó el texto.
+
+Por defecto el motor secundario corre en un hilo del mismo proceso, así que
+comparte el GIL con la interfaz y con el análisis principal: un motor ligero
+no se nota, pero uno que use mucha CPU sí puede frenarlos. Con
+`SOMBRA_EN_SUBPROCESO = True` el motor corre en un proceso aparte y el hilo
+solo espera su respuesta. El proceso se crea con "spawn" y no con "fork",
+porque la interfaz tiene varios hilos en marcha.
+
+Los mensajes descartados porque la cola estaba llena también se registran,
+para que el reporte indique qué parte del tráfico cubre.
+
+Uso del reporte:
+    python -m utils.evaluacion_sombra [ruta_log]
+"""
+import importlib
+import json
+import multiprocessing
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from config.constantes import (
+    MOTOR_SOMBRA, RUTA_LOG_SOMBRA, MAX_PENDIENTES_SOMBRA, SOMBRA_EN_SUBPROCESO, PLAZO_CIERRE_SOMBRA_S
+)
+
+
+def cargar_motor(ruta: str) -> Callable:
+    """Importa una función de análisis a partir de una ruta 'modulo:funcion'"""
+    modulo, _, funcion = ruta.partition(":")
+    if not modulo or not funcion:
+        raise ValueError(f"Ruta de motor inválida: '{ruta}' (se espera 'modulo:funcion')")
+    return getattr(importlib.import_module(modulo), funcion)
+
+
+def _medir_motor(motor: Callable, texto: str) -> Tuple[Optional[str], float, Optional[str]]:
+    """Ejecuta el motor y retorna (estado, latencia_ms, error)"""
+    error = None
+    inicio = time.perf_counter()
+    try:
+        estado = motor(texto)
+        # Aceptar motores con la firma de `obtener_descripcion_animo`
+        if isinstance(estado, tuple):
+            estado = estado[0]
+    except Exception as e:
+        estado = None
+        error = str(e)
+    return estado, (time.perf_counter() - inicio) * 1000, error
+
+
+_motores_cargados: Dict[str, Callable] = {}
+
+
+def _medir_motor_por_ruta(ruta: str, texto: str) -> Tuple[Optional[str], float, Optional[str]]:
+    """Versión de `_medir_motor` que se ejecuta en el subproceso"""
+    if ruta not in _motores_cargados:
+        _motores_cargados[ruta] = cargar_motor(ruta)
+    return _medir_motor(_motores_cargados[ruta], texto)
+
+
+class EvaluadorSombra:
+    """Ejecuta un motor secundario en segundo plano y registra la comparación
+
+    `motor` es una función o una ruta 'modulo:funcion'; con `en_subproceso`
+    debe ser una ruta, que se importa en el proceso aparte.
+    """
+
+    def __init__(self, motor: Union[Callable, str], ruta_log: str = RUTA_LOG_SOMBRA,
+                 max_pendientes: int = MAX_PENDIENTES_SOMBRA, en_subproceso: bool = False):
+        self._procesos: Optional[ProcessPoolExecutor] = None
+        if en_subproceso:
+            if not isinstance(motor, str):
+                raise ValueError("En subproceso el motor debe indicarse como 'modulo:funcion'")
+            self._procesos = ProcessPoolExecutor(max_workers=1,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+        elif isinstance(motor, str):
+            motor = cargar_motor(motor)
+        self.motor = motor
+        self.ruta_log = Path(ruta_log)
+        self.descartados = 0
+        self._descartados_pendientes = 0
+        self._lock = threading.Lock()
+        self._cola: queue.Queue = queue.Queue(maxsize=max_pendientes)
+        self._hilo = threading.Thread(target=self._trabajar, name="evaluador-sombra", daemon=True)
+        self._hilo.start()
+
+    def registrar(self, texto: str, estado_principal: Optional[str], latencia_principal_ms: float,
+                  nivel: str = "completo") -> None:
+        """Encola un mensaje para compararlo; nunca bloquea al llamador.
+
+        `nivel` indica de dónde salió la respuesta principal ("completo",
+        "cache", "palabras_clave" o "neutral").
+
+        Si la cola está llena el mensaje se descarta en lugar de frenar la
+        respuesta al usuario; los descartes se anotan en el log.
+        """
+        try:
+            self._cola.put_nowait((texto, estado_principal, latencia_principal_ms, nivel,
+                                   datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+        except queue.Full:
+            with self._lock:
+                self.descartados += 1
+                self._descartados_pendientes += 1
+
+    def esperar(self) -> None:
+        """Bloquea hasta que se hayan procesado todos los mensajes pendientes"""
+        self._cola.join()
+
+    def cerrar(self, plazo_s: float = PLAZO_CIERRE_SOMBRA_S) -> None:
+        """Procesa lo pendiente durante como mucho `plazo_s` segundos y libera el subproceso.
+
+        Los mensajes que sigan en la cola se anotan como descartados; un motor
+        lento o bloqueado no retrasa el cierre más allá del plazo.
+        """
+        fin = time.monotonic() + plazo_s
+        with self._cola.all_tasks_done:
+            while self._cola.unfinished_tasks:
+                restante = fin - time.monotonic()
+                if restante <= 0:
+                    break
+                self._cola.all_tasks_done.wait(restante)
+
+        sin_procesar = 0
+        while True:
+            try:
+                self._cola.get_nowait()
+            except queue.Empty:
+                break
+            self._cola.task_done()
+            sin_procesar += 1
+        with self._lock:
+            self.descartados += sin_procesar
+            pendientes, self._descartados_pendientes = self._descartados_pendientes + sin_procesar, 0
+        if pendientes:
+            self._escribir({"fecha": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                            "descartados": pendientes})
+        if self._procesos is not None:
+            self._procesos.shutdown(wait=False, cancel_futures=True)
+
+    def _trabajar(self) -> None:
+        while True:
+            texto, estado_principal, latencia_principal_ms, nivel, fecha = self._cola.get()
+            try:
+                self._comparar(texto, estado_principal, latencia_principal_ms, nivel, fecha)
+            except Exception as e:
+                print(f"Error en la evaluación en sombra: {e}")
+            finally:
+                self._cola.task_done()
+
+    def _comparar(self, texto: str, estado_principal: Optional[str],
+                  latencia_principal_ms: float, nivel: str, fecha: str) -> None:
+        if self._procesos is not None:
+            estado_sombra, latencia_sombra_ms, error = self._procesos.submit(
+                _medir_motor_por_ruta, self.motor, texto).result()
+        else:
+            estado_sombra, latencia_sombra_ms, error = _medir_motor(self.motor, texto)
+
+        registro = {
+            "fecha": fecha,
+            "texto": texto,
+            "estado_principal": estado_principal,
+            "nivel": nivel,
+            "estado_sombra": estado_sombra,
+            "coincide": error is None and estado_sombra == estado_principal,
+            "latencia_principal_ms": round(latencia_principal_ms, 3),
+            "latencia_sombra_ms": round(latencia_sombra_ms, 3),
+        }
+        if error is not None:
+            registro["error"] = error
+        with self._lock:
+            if self._descartados_pendientes:
+                registro["descartados_antes"] = self._descartados_pendientes
+                self._descartados_pendientes = 0
+        self._escribir(registro)
+
+    def _escribir(self, registro: Dict) -> None:
+        with open(self.ruta_log, "a", encoding="utf-8") as f:
+            f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+
+
+def crear_evaluador() -> Optional[EvaluadorSombra]:
+    """Crea el evaluador según `MOTOR_SOMBRA`, o retorna None si está desactivado"""
+    if not MOTOR_SOMBRA:
+        return None
+    try:
+        return EvaluadorSombra(MOTOR_SOMBRA, en_subproceso=SOMBRA_EN_SUBPROCESO)
+    except Exception as e:
+        print(f"No se pudo iniciar la evaluación en sombra: {e}")
+        return None
+
+
+def _percentil(valores: List[float], p: float) -> float:
+    ordenados = sorted(valores)
+    indice = min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))
+    return ordenados[indice]
+
+
+def _resumen_latencias(valores: List[float]) -> Dict:
+    if not valores:
+        return {}
+    return {
+        "media_ms": round(sum(valores) / len(valores), 3),
+        "p50_ms": round(_percentil(valores, 50), 3),
+        "p95_ms": round(_percentil(valores, 95), 3),
+    }
+
+
+def resumir_log(ruta_log: str = RUTA_LOG_SOMBRA) -> Dict:
+    """Lee el log de la evaluación en sombra y calcula el resumen de acuerdo y latencias"""
+    registros = []
+    ruta = Path(ruta_log)
+    if ruta.exists():
+        with open(ruta, "r", encoding="utf-8") as f:
+            for linea in f:
+                linea = linea.strip()
+                if linea:
+                    registros.append(json.loads(linea))
+
+    # Las líneas solo con "descartados" anotan mensajes que no se compararon
+    descartados = sum(r.get("descartados", 0) + r.get("descartados_antes", 0) for r in registros)
+    registros = [r for r in registros if "estado_principal" in r]
+    if not registros and not descartados:
+        return {}
+    if not registros:
+        return {"total": 0, "descartados": descartados, "cobertura": 0.0}
+
+    coincidencias = sum(1 for r in registros if r["coincide"])
+    errores = sum(1 for r in registros if "error" in r)
+    desacuerdos: Dict[str, int] = {}
+    for r in registros:
+        if not r["coincide"] and "error" not in r:
+            clave = f"{r['estado_principal']} -> {r['estado_sombra']}"
+            desacuerdos[clave] = desacuerdos.get(clave, 0) + 1
+
+    # Las latencias de la caché o de respuestas degradadas no miden al motor principal
+    completos = [r for r in registros if r.get("nivel", "completo") == "completo"]
+    latencias_principal = [r["latencia_principal_ms"] for r in completos]
+    latencias_sombra = [r["latencia_sombra_ms"] for r in completos if "error" not in r]
+    ahorro = [r["latencia_principal_ms"] - r["latencia_sombra_ms"] for r in completos if "error" not in r]
+    niveles: Dict[str, int] = {}
+    for r in registros:
+        nivel = r.get("nivel", "completo")
+        niveles[nivel] = niveles.get(nivel, 0) + 1
+
+    return {
+        "total": len(registros),
+        "descartados": descartados,
+        "cobertura": len(registros) / (len(registros) + descartados),
+        "coincidencias": coincidencias,
+        "tasa_acuerdo": coincidencias / len(registros),
+        "errores": errores,
+        "desacuerdos": desacuerdos,
+        "niveles": niveles,
+        "latencia_principal": _resumen_latencias(latencias_principal),
+        "latencia_sombra": _resumen_latencias(latencias_sombra),
+        "ahorro_medio_ms": round(sum(ahorro) / len(ahorro), 3) if ahorro else 0.0,
+    }
+
+
+def formatear_resumen(resumen: Dict) -> str:
+    """Da formato legible al resumen producido por `resumir_log`"""
+    if not resumen:
+        return "No hay registros de evaluación en sombra."
+
+    if not resumen["total"]:
+        return f"No se comparó ningún mensaje ({resumen['descartados']} descartados por cola llena)."
+
+    lineas = [
+        f"Mensajes comparados: {resumen['total']} "
+        f"(descartados por cola llena: {resumen['descartados']}, cobertura {resumen['cobertura']:.1%})",
+        f"Acuerdo: {resumen['coincidencias']}/{resumen['total']} ({resumen['tasa_acuerdo']:.1%})",
+        f"Errores del motor en sombra: {resumen['errores']}",
+        "Respuestas principales por nivel: " + ", ".join(
+            f"{nivel} {n}" for nivel, n in sorted(resumen["niveles"].items())),
+    ]
+    for nombre, etiqueta in (("principal", "principal (mensaje completo)"), ("sombra", "sombra")):
+        lat = resumen[f"latencia_{nombre}"]
+        if lat:
+            lineas.append(
+                f"Latencia {etiqueta}: media {lat['media_ms']:.2f} ms, "
+                f"p50 {lat['p50_ms']:.2f} ms, p95 {lat['p95_ms']:.2f} ms"
+            )
+    lineas.append(f"Ahorro medio por mensaje: {resumen['ahorro_medio_ms']:.2f} ms")
+    if resumen["desacuerdos"]:
+        lineas.append("Desacuerdos (principal -> sombra):")
+        for clave, n in sorted(resumen["desacuerdos"].items(), key=lambda x: -x[1]):
+            lineas.append(f"   {clave}: {n}")
+    return "\n".join(lineas)
+
+
+if __name__ == "__main__":
+    print(formatear_resumen(resumir_log(sys.argv[1] if len(sys.argv) > 1 else RUTA_LOG_SOMBRA)))
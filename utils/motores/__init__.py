@@ -0,0 +1,102 @@
+"""
+Motores de análisis de texto intercambiables.
+
+El motor se elige con `MOTOR_ANALISIS` en config/constantes.py:
+- "spacy": spaCy + TextBlob (análisis completo)
+- "lexico": Python puro, sin dependencias y con arranque inmediato
+- "auto": spaCy si está instalado junto con un modelo en español; si no, "lexico"
+
+El motor se crea la primera vez que se necesita, así que importar este paquete
+(o `utils.procesador_lenguaje`) no carga spaCy.
+"""
+import threading
+from importlib.util import find_spec
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from config import constantes
+from utils.motores.base import MotorAnalisis
+
+_motor_activo: Optional[MotorAnalisis] = None
+_lock = threading.Lock()
+_oyentes: List[Callable[[MotorAnalisis], None]] = []
+
+
+def al_crear_motor(oyente: Callable[[MotorAnalisis], None]) -> None:
+    """Registra una función que se llama con cada motor que pasa a estar activo"""
+    _oyentes.append(oyente)
+
+
+def _notificar(motor: MotorAnalisis) -> None:
+    for oyente in _oyentes:
+        oyente(motor)
+
+
+def diagnosticar_spacy() -> Optional[str]:
+    """Comprueba, sin cargarlos, si spaCy y un modelo en español están instalados.
+
+    Retorna None si están disponibles, "libreria" si falta spaCy o TextBlob,
+    o "modelo" si falta el modelo en español.
+    """
+    if find_spec("spacy") is None or find_spec("textblob") is None:
+        return "libreria"
+    if constantes.RUTA_MODELO_REDUCIDO:
+        return None if Path(constantes.RUTA_MODELO_REDUCIDO).exists() else "modelo"
+    if find_spec("es_core_news_md") is None and find_spec("es_core_news_sm") is None:
+        return "modelo"
+    return None
+
+
+def nombre_motor_configurado() -> str:
+    """Nombre del motor que se usa (o se usará), sin necesidad de cargarlo"""
+    if _motor_activo is not None:
+        return _motor_activo.nombre
+    if constantes.MOTOR_ANALISIS != "auto":
+        return constantes.MOTOR_ANALISIS
+    return "spacy" if diagnosticar_spacy() is None else "lexico"
+
+
+def crear_motor(nombre: str) -> MotorAnalisis:
+    """Crea el motor indicado por su nombre"""
+    if nombre == "spacy":
+        from utils.motores.spacy_textblob import MotorSpacy
+        return MotorSpacy()
+    if nombre == "lexico":
+        from utils.motores.lexico import MotorLexico
+        return MotorLexico()
+    raise ValueError(f"Motor de análisis desconocido: '{nombre}'")
+
+
+def _crear_motor_configurado() -> MotorAnalisis:
+    nombre = constantes.MOTOR_ANALISIS
+    if nombre != "auto":
+        return crear_motor(nombre)
+
+    if diagnosticar_spacy() is None:
+        try:
+            return crear_motor("spacy")
+        except Exception as e:
+            print(f"No se pudo cargar spaCy ({e}); se usa el motor léxico")
+    return crear_motor("lexico")
+
+
+def obtener_motor() -> MotorAnalisis:
+    """Retorna el motor activo, creándolo en el primer uso"""
+    global _motor_activo
+    if _motor_activo is None:
+        with _lock:
+            if _motor_activo is not None:
+                return _motor_activo
+            motor = _crear_motor_configurado()
+            _notificar(motor)
+            _motor_activo = motor
+    return _motor_activo
+
+
+def establecer_motor(motor: Optional[MotorAnalisis]) -> None:
+    """Fija el motor activo (None para volver a elegirlo según la configuración)"""
+    global _motor_activo
+    with _lock:
+        if motor is not None:
+            _notificar(motor)
+        _motor_activo = motor
@@ -0,0 +1,22 @@
+"""
+Interfaz común de los motores de análisis
+"""
+from abc import ABC, abstractmethod
+from typing import Sequence
+
+
+class MotorAnalisis(ABC):
+    """Operaciones básicas que `utils.procesador_lenguaje` necesita de un motor.
+
+    Los tokens devueltos por `procesar` deben tener los atributos `text`,
+    `lemma_`, `dep_`, `i` y `head` (igual que los tokens de spaCy).
+    """
+    nombre = "base"
+
+    @abstractmethod
+    def procesar(self, texto: str) -> Sequence:
+        """Tokeniza y analiza el texto"""
+
+    @abstractmethod
+    def polaridad(self, texto: str) -> float:
+        """Sentimiento del texto entre -1 (muy negativo) y 1 (muy positivo)"""
@@ -0,0 +1,56 @@
+"""
+Motor de análisis léxico en Python puro (sin spaCy ni TextBlob)
+
+Cubre lo que usa el procesador: tokenización, negación, intensidad y palabras
+clave. Arranca al instante, a costa de no hacer análisis sintáctico.
+"""
+import re
+from typing import List
+
+from config.constantes import ESTADOS_ANIMO_KEYWORDS
+from utils.motores.base import MotorAnalisis
+
+PATRON_TOKEN = re.compile(r"\w+")
+
+NEGACIONES = {"no", "ni", "tampoco", "nunca", "jamás", "jamas"}
+
+# Lemas de las formas verbales que el procesador busca
+LEMAS = {
+    "siento": "sentir", "sientes": "sentir", "siente": "sentir", "sentimos": "sentir",
+    "estoy": "estar", "estás": "estar", "estas": "estar", "está": "estar", "estamos": "estar",
+    "ando": "andar", "andas": "andar", "anda": "andar", "andamos": "andar",
+    "soy": "ser", "eres": "ser", "es": "ser", "somos": "ser",
+    "tengo": "tener", "tienes": "tener", "tiene": "tener", "tenemos": "tener",
+    "horas": "hora", "minutos": "minuto",
+}
+
+
+class Token:
+    """Token mínimo con la misma forma que un token de spaCy"""
+    __slots__ = ("text", "lemma_", "dep_", "i", "head")
+
+    def __init__(self, text: str, i: int):
+        self.text = text
+        self.lemma_ = LEMAS.get(text, text)
+        self.dep_ = "neg" if text in NEGACIONES else ""
+        self.i = i
+        self.head = self
+
+
+class MotorLexico(MotorAnalisis):
+    """Tokenización por expresiones regulares y sentimiento por palabras clave"""
+    nombre = "lexico"
+
+    def procesar(self, texto: str) -> List[Token]:
+        tokens = [Token(palabra, i) for i, palabra in enumerate(PATRON_TOKEN.findall(texto.lower()))]
+        # Sin árbol sintáctico: el núcleo de cada token es el siguiente, lo que
+        # basta para frases como "ya no" o "para nada"
+        for actual, siguiente in zip(tokens, tokens[1:]):
+            actual.head = siguiente
+        return tokens
+
+    def polaridad(self, texto: str) -> float:
+        texto = texto.lower()
+        positivas = sum(1 for kw in ESTADOS_ANIMO_KEYWORDS["motivado"] if kw in texto)
+        negativas = sum(1 for kw in ESTADOS_ANIMO_KEYWORDS["cansado"] if kw in texto)
+        return (positivas - negativas) / (positivas + negativas + 1)
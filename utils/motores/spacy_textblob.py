@@ -0,0 +1,22 @@
+"""
+Motor de análisis completo basado en spaCy y TextBlob
+"""
+from utils.motores.base import MotorAnalisis
+from utils.vectores import cargar_modelo_spacy
+
+
+class MotorSpacy(MotorAnalisis):
+    """Análisis sintáctico con spaCy y sentimiento con TextBlob"""
+    nombre = "spacy"
+
+    def __init__(self):
+        from textblob import TextBlob
+        self._textblob = TextBlob
+        # Cargar el modelo de spaCy en español (md, sm o el modelo reducido configurado)
+        self.nlp = cargar_modelo_spacy()
+
+    def procesar(self, texto: str):
+        return self.nlp(texto)
+
+    def polaridad(self, texto: str) -> float:
+        return self._textblob(texto).sentiment.polarity
@@ -0,0 +1,217 @@
+"""
+Ejecución de análisis con presupuesto de latencia.
+
+El análisis completo se ejecuta en un hilo de trabajo y se espera como mucho
+el presupuesto indicado. Si no termina a tiempo se responde con una
+alternativa más barata; el análisis completo sigue en segundo plano y, al
+terminar, actualiza la caché (las funciones completas están decoradas con
+`cacheado`), de modo que la siguiente vez la respuesta ya es completa.
+
+Para que un análisis lento no retrase a los siguientes:
+- Hay como mucho un análisis en curso por texto; quien pida el mismo texto
+  espera a ese análisis en lugar de encolar otro.
+- Mientras el hilo de trabajo siga ocupado con un análisis que ya agotó su
+  presupuesto (o cargando el motor, ver `calentar_motor`), no se encolan
+  análisis nuevos: se responde directamente con la alternativa.
+
+Se cuenta cuántas respuestas se dieron en cada nivel para dimensionar el
+hardware (`estadisticas_degradacion`). Con `iniciar_registro` los conteos se
+añaden periódicamente a `RUTA_LOG_DEGRADACION`, que suma los de todas las
+sesiones y procesos:
+    python -m utils.plazos [ruta_log]
+"""
+import json
+import os
+import sys
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as TiempoAgotado
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from config import constantes
+from utils.cache_analisis import consultar_cache, normalizar_clave
+from utils.motores import obtener_motor
+
+NIVELES = ("cache", "completo", "palabras_clave", "neutral")
+# Cada cuántas respuestas se añaden los conteos al registro
+INTERVALO_REGISTRO = 100
+
+_contadores: Dict[str, int] = {nivel: 0 for nivel in NIVELES}
+# Conteos aún no escritos en el registro
+_sin_registrar: Dict[str, int] = {nivel: 0 for nivel in NIVELES}
+_ruta_registro: Optional[str] = None
+_lock = threading.Lock()
+_ejecutor: Optional[ThreadPoolExecutor] = None
+_ejecutor_pid: Optional[int] = None
+# Análisis en curso por (función, texto normalizado)
+_en_curso: Dict[Tuple[str, str], Future] = {}
+# Tarea que ocupa el hilo de trabajo más allá de su presupuesto
+_ocupado: Optional[Future] = None
+
+
+def _obtener_ejecutor() -> ThreadPoolExecutor:
+    """Ejecutor de un solo hilo, propio de cada proceso (los hilos no sobreviven a un fork)"""
+    global _ejecutor, _ejecutor_pid, _ocupado
+    with _lock:
+        if _ejecutor is None or _ejecutor_pid != os.getpid():
+            _ejecutor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="analisis")
+            _ejecutor_pid = os.getpid()
+            # Las tareas del proceso padre no existen en este
+            _en_curso.clear()
+            _ocupado = None
+        return _ejecutor
+
+
+def _contar(nivel: str) -> None:
+    with _lock:
+        _contadores[nivel] += 1
+        _sin_registrar[nivel] += 1
+        pendientes = sum(_sin_registrar.values())
+    if _ruta_registro and pendientes >= INTERVALO_REGISTRO:
+        guardar_estadisticas()
+
+
+def _liberar(clave: Optional[Tuple[str, str]], futuro: Future) -> None:
+    global _ocupado
+    with _lock:
+        if clave is not None and _en_curso.get(clave) is futuro:
+            del _en_curso[clave]
+        if _ocupado is futuro:
+            _ocupado = None
+
+
+def calentar_motor() -> Future:
+    """Carga el motor en el hilo de trabajo sin bloquear al llamador.
+
+    Mientras carga, las respuestas con presupuesto se dan con la alternativa
+    en lugar de esperar la carga dentro del presupuesto. Retorna la tarea de
+    carga, por si se quiere esperar a que termine.
+    """
+    global _ocupado
+    ejecutor = _obtener_ejecutor()
+    with _lock:
+        futuro = ejecutor.submit(obtener_motor)
+        _ocupado = futuro
+    futuro.add_done_callback(lambda f: _liberar(None, f))
+    return futuro
+
+
+def _degradar(alternativa: Callable[[str], Tuple[str, Any]], texto: str) -> Tuple[str, Any]:
+    nivel, resultado = alternativa(texto)
+    _contar(nivel)
+    return nivel, resultado
+
+
+def ejecutar_con_plazo(completa: Callable, funcion_cache: str, texto: str, presupuesto_ms: float,
+                       alternativa: Callable[[str], Tuple[str, Any]]) -> Tuple[str, Any]:
+    """Ejecuta `completa(texto)` con un presupuesto de `presupuesto_ms` milisegundos.
+
+    `alternativa(texto)` debe ser barata y retornar (nivel, resultado), con
+    nivel "palabras_clave" o "neutral". Retorna (nivel, resultado), donde el
+    nivel es uno de `NIVELES`: solo "completo" implica que se ejecutó el motor.
+    """
+    global _ocupado
+    guardado = consultar_cache(funcion_cache, texto)
+    if guardado is not None:
+        _contar("cache")
+        return "cache", guardado
+
+    ejecutor = _obtener_ejecutor()
+    clave = (funcion_cache, normalizar_clave(texto))
+    nuevo = False
+    with _lock:
+        futuro = _en_curso.get(clave)
+        if futuro is None and (_ocupado is None or _ocupado.done()):
+            futuro = ejecutor.submit(completa, texto)
+            _en_curso[clave] = futuro
+            nuevo = True
+    if nuevo:
+        futuro.add_done_callback(lambda f: _liberar(clave, f))
+
+    if futuro is None:
+        # El hilo sigue con un análisis atrasado: no encolar otro detrás
+        return _degradar(alternativa, texto)
+    try:
+        resultado = futuro.result(timeout=presupuesto_ms / 1000)
+    except TiempoAgotado:
+        # El análisis termina en segundo plano y llena la caché
+        with _lock:
+            _ocupado = futuro
+        return _degradar(alternativa, texto)
+    _contar("completo")
+    return "completo", resultado
+
+
+def estadisticas_degradacion() -> Dict:
+    """Respuestas por nivel y proporción de respuestas degradadas"""
+    with _lock:
+        contadores = dict(_contadores)
+    return _resumir(contadores)
+
+
+def _resumir(contadores: Dict[str, int]) -> Dict:
+    total = sum(contadores.values())
+    degradadas = contadores["palabras_clave"] + contadores["neutral"]
+    return {
+        "total": total,
+        "niveles": contadores,
+        "proporcion_degradada": degradadas / total if total else 0.0,
+    }
+
+
+def reiniciar_estadisticas() -> None:
+    with _lock:
+        for nivel in NIVELES:
+            _contadores[nivel] = 0
+            _sin_registrar[nivel] = 0
+
+
+def iniciar_registro(ruta: Optional[str] = None) -> None:
+    """Activa el registro de los conteos en `ruta` (por defecto `RUTA_LOG_DEGRADACION`).
+
+    Sin llamar a esta función los conteos solo se guardan en memoria (p. ej. en pruebas).
+    """
+    global _ruta_registro
+    _ruta_registro = ruta or constantes.RUTA_LOG_DEGRADACION
+
+
+def guardar_estadisticas() -> None:
+    """Añade al registro los conteos de este proceso aún no escritos"""
+    if not _ruta_registro:
+        return
+    with _lock:
+        niveles = {nivel: n for nivel, n in _sin_registrar.items() if n}
+        for nivel in NIVELES:
+            _sin_registrar[nivel] = 0
+    if not niveles:
+        return
+    registro = {"fecha": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "pid": os.getpid(),
+                "niveles": niveles}
+    try:
+        with open(_ruta_registro, "a", encoding="utf-8") as f:
+            f.write(json.dumps(registro) + "\n")
+    except OSError as e:
+        print(f"No se pudo guardar el registro de degradación: {e}")
+
+
+def resumir_registro(ruta: Optional[str] = None) -> Dict:
+    """Suma los conteos del registro, con el mismo formato que `estadisticas_degradacion`"""
+    contadores = {nivel: 0 for nivel in NIVELES}
+    archivo = Path(ruta or constantes.RUTA_LOG_DEGRADACION)
+    if archivo.exists():
+        with open(archivo, "r", encoding="utf-8") as f:
+            for linea in f:
+                linea = linea.strip()
+                if linea:
+                    for nivel, n in json.loads(linea)["niveles"].items():
+                        contadores[nivel] = contadores.get(nivel, 0) + n
+    return _resumir(contadores)
+
+
+if __name__ == "__main__":
+    resumen = resumir_registro(sys.argv[1] if len(sys.argv) > 1 else None)
+    print(f"Respuestas registradas: {resumen['total']}")
+    for nivel in NIVELES:
+        print(f"   {nivel}: {resumen['niveles'][nivel]}")
+    print(f"Proporción degradada: {resumen['proporcion_degradada']:.1%}")
@@ -0,0 +1,341 @@
+"""
+Pool de procesos pre-fork para el análisis de texto (solo Linux/macOS).
+
+Un solo proceso de Python queda limitado a un núcleo por el GIL, y cada
+proceso nuevo tendría que volver a cargar `es_core_news_md`. En este modo:
+- El proceso padre carga el motor, lo calienta con frases de ejemplo y
+  congela su heap con `gc.freeze()` antes de crear los trabajadores con
+  `fork`, de modo que todos comparten la memoria del modelo copy-on-write.
+- El padre supervisa a los trabajadores: si uno termina (por un fallo o por
+  haber atendido `MAX_PETICIONES_TRABAJADOR` peticiones) se crea otro.
+- Los trabajadores aceptan conexiones sobre un mismo socket Unix; cada
+  conexión lleva una petición JSON de una línea y recibe una respuesta.
+- Cada trabajador añade sus conteos por nivel de respuesta al registro de
+  `utils.plazos` al terminar; la petición "estado" también los devuelve.
+
+Uso:
+    python -m utils.pool_procesos servir --trabajadores 4
+    python -m utils.pool_procesos medir --trabajadores 4
+"""
+import argparse
+import gc
+import json
+import os
+import signal
+import socket
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from config.constantes import RUTA_SOCKET_POOL, TRABAJADORES_POOL, MAX_PETICIONES_TRABAJADOR
+from utils import procesador_lenguaje
+from utils import plazos
+from utils.motores import obtener_motor
+from utils.vectores import CORPUS_ANIMO
+
+MAX_BYTES_PETICION = 64 * 1024
+# Un trabajador que termina antes de este tiempo se considera caído al iniciar
+VIDA_MINIMA_S = 1.0
+
+FUNCIONES = {
+    "animo": procesador_lenguaje.obtener_descripcion_animo,
+    "tiempo": procesador_lenguaje.obtener_descripcion_tiempo,
+    "mensaje": procesador_lenguaje.analizar_mensaje,
+}
+
+
+class ServidorPrefork:
+    """Proceso supervisor que comparte el modelo cargado con N trabajadores"""
+
+    def __init__(self, ruta_socket: str = RUTA_SOCKET_POOL, trabajadores: Optional[int] = TRABAJADORES_POOL,
+                 max_peticiones: int = MAX_PETICIONES_TRABAJADOR, usar_cache: bool = True):
+        if not hasattr(os, "fork"):
+            raise RuntimeError("El pool pre-fork requiere un sistema con fork (Linux o macOS)")
+        self.ruta_socket = ruta_socket
+        self.trabajadores = trabajadores or os.cpu_count() or 1
+        self.max_peticiones = max_peticiones
+        self.usar_cache = usar_cache
+        self._hijos: Dict[int, float] = {}  # pid -> momento de inicio
+        self._activo = False
+        self._socket: Optional[socket.socket] = None
+
+    def preparar(self) -> None:
+        """Carga y calienta el motor en el padre y congela el heap"""
+        # Calentar antes de abrir la caché: con la caché abierta las frases de
+        # ejemplo ya guardadas no llegarían al motor, y su estado perezoso se
+        # crearía después del fork en cada trabajador
+        motor = obtener_motor()
+        for texto, _ in CORPUS_ANIMO:
+            motor.procesar(texto)
+            motor.polaridad(texto)
+            procesador_lenguaje.analizar_mensaje(texto)
+            procesador_lenguaje.obtener_descripcion_animo(texto)
+        if self.usar_cache:
+            from utils.cache_analisis import iniciar_cache
+            iniciar_cache()
+        plazos.iniciar_registro()
+        # Lo que existe ahora no volverá a ser recorrido por el recolector, así que
+        # sus páginas no se copian en los trabajadores al hacer gc
+        gc.collect()
+        gc.freeze()
+
+    def servir(self) -> None:
+        """Prepara el modelo, crea los trabajadores y los supervisa hasta recibir SIGTERM/SIGINT"""
+        self.preparar()
+        if os.path.exists(self.ruta_socket):
+            os.unlink(self.ruta_socket)
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.bind(self.ruta_socket)
+        self._socket.listen(128)
+
+        self._activo = True
+        signal.signal(signal.SIGTERM, self._al_detener)
+        signal.signal(signal.SIGINT, self._al_detener)
+        try:
+            for _ in range(self.trabajadores):
+                self._crear_trabajador()
+            self._supervisar()
+        finally:
+            self._socket.close()
+            if os.path.exists(self.ruta_socket):
+                os.unlink(self.ruta_socket)
+
+    def _al_detener(self, signum, frame) -> None:
+        self._activo = False
+        for pid in list(self._hijos):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def _supervisar(self) -> None:
+        while self._hijos:
+            try:
+                pid, estado = os.wait()
+            except ChildProcessError:
+                break
+            inicio = self._hijos.pop(pid, None)
+            if not self._activo or inicio is None:
+                continue
+            if os.WIFSIGNALED(estado) or os.WEXITSTATUS(estado) != 0:
+                print(f"Trabajador {pid} terminó con estado {estado}; se reemplaza")
+                if time.monotonic() - inicio < VIDA_MINIMA_S:
+                    time.sleep(VIDA_MINIMA_S)  # Evitar reinicios en bucle
+            self._crear_trabajador()
+
+    def _crear_trabajador(self) -> None:
+        # Bloquear las señales de parada mientras se crea el hijo, para que el
+        # manejador nunca vea la lista de hijos sin el recién creado
+        senales = {signal.SIGTERM, signal.SIGINT}
+        signal.pthread_sigmask(signal.SIG_BLOCK, senales)
+        pid = None
+        try:
+            if not self._activo:
+                return
+            pid = os.fork()
+            if pid:
+                self._hijos[pid] = time.monotonic()
+                return
+        finally:
+            # El hijo desbloquea las señales después de restaurar sus manejadores
+            if pid != 0:
+                signal.pthread_sigmask(signal.SIG_UNBLOCK, senales)
+
+        # Proceso hijo
+        codigo = 0
+        try:
+            # SIGTERM termina el bucle con SystemExit para registrar los conteos
+            signal.signal(signal.SIGTERM, _salir)
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            plazos.reiniciar_estadisticas()
+            signal.pthread_sigmask(signal.SIG_UNBLOCK, senales)
+            self._trabajar()
+        except Exception as e:
+            print(f"Error en el trabajador {os.getpid()}: {e}")
+            codigo = 1
+        finally:
+            plazos.guardar_estadisticas()
+            # Salir sin ejecutar los manejadores de salida heredados del padre
+            os._exit(codigo)
+
+    def _trabajar(self) -> None:
+        atendidas = 0
+        while atendidas < self.max_peticiones:
+            conexion, _ = self._socket.accept()
+            with conexion:
+                conexion.settimeout(10)
+                try:
+                    self._atender(conexion)
+                except (OSError, ValueError) as e:
+                    print(f"Error de comunicación en el trabajador {os.getpid()}: {e}")
+            atendidas += 1
+
+    def _atender(self, conexion: socket.socket) -> None:
+        with conexion.makefile("rb") as lector:
+            linea = lector.readline(MAX_BYTES_PETICION)
+        peticion = json.loads(linea)
+        respuesta = self._responder(peticion)
+        conexion.sendall(json.dumps(respuesta, ensure_ascii=False).encode("utf-8") + b"\n")
+
+    def _responder(self, peticion: Dict) -> Dict:
+        funcion = peticion.get("funcion")
+        if funcion == "estado":
+            return {"ok": True, "resultado": {"padre": os.getppid(), "trabajador": os.getpid(),
+                                              "degradacion": plazos.estadisticas_degradacion()}}
+        if funcion not in FUNCIONES:
+            return {"ok": False, "error": f"Función desconocida: '{funcion}'"}
+        try:
+            args = [peticion.get("texto", "")]
+            if funcion != "tiempo" and peticion.get("presupuesto_ms") is not None:
+                args.append(peticion["presupuesto_ms"])
+            return {"ok": True, "resultado": FUNCIONES[funcion](*args)}
+        except Exception as e:
+            return {"ok": False, "error": str(e)}
+
+
+def _salir(signum, frame) -> None:
+    raise SystemExit(0)
+
+
+def consultar(funcion: str, texto: str = "", ruta_socket: str = RUTA_SOCKET_POOL,
+              presupuesto_ms: Optional[float] = None, timeout: float = 30) -> Any:
+    """Envía una petición al pool y retorna el resultado.
+
+    Las tuplas llegan como listas (JSON). Lanza RuntimeError si el trabajador
+    informa un error.
+    """
+    peticion = {"funcion": funcion, "texto": texto}
+    if presupuesto_ms is not None:
+        peticion["presupuesto_ms"] = presupuesto_ms
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as cliente:
+        cliente.settimeout(timeout)
+        cliente.connect(ruta_socket)
+        cliente.sendall(json.dumps(peticion, ensure_ascii=False).encode("utf-8") + b"\n")
+        with cliente.makefile("rb") as lector:
+            respuesta = json.loads(lector.readline())
+    if not respuesta["ok"]:
+        raise RuntimeError(respuesta["error"])
+    return respuesta["resultado"]
+
+
+def memoria_proceso(pid: int) -> Dict[str, float]:
+    """RSS, PSS y memoria privada (la que no se comparte) de un proceso, en MB"""
+    campos = {"Rss": 0, "Pss": 0, "Private_Clean": 0, "Private_Dirty": 0}
+    with open(f"/proc/{pid}/smaps_rollup", "r", encoding="utf-8") as f:
+        for linea in f:
+            nombre, _, valor = linea.partition(":")
+            if nombre in campos:
+                campos[nombre] = int(valor.split()[0])
+    return {
+        "rss_mb": campos["Rss"] / 1024,
+        "pss_mb": campos["Pss"] / 1024,
+        "privada_mb": (campos["Private_Clean"] + campos["Private_Dirty"]) / 1024,
+    }
+
+
+def _esperar_pool(ruta_socket: str, limite_s: float = 120) -> None:
+    fin = time.monotonic() + limite_s
+    while True:
+        try:
+            consultar("estado", ruta_socket=ruta_socket, timeout=5)
+            return
+        except (OSError, RuntimeError):
+            if time.monotonic() > fin:
+                raise
+            time.sleep(0.1)
+
+
+def _pids_trabajadores(pid_padre: int) -> List[int]:
+    """Procesos hijos de `pid_padre`, según /proc/<pid>/status"""
+    pids = []
+    for entrada in os.listdir("/proc"):
+        if not entrada.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entrada}/status", "r", encoding="utf-8") as f:
+                for linea in f:
+                    if linea.startswith("PPid:"):
+                        if int(linea.split()[1]) == pid_padre:
+                            pids.append(int(entrada))
+                        break
+        except OSError:
+            continue
+    return pids
+
+
+def medir_escalado(max_trabajadores: int, peticiones: int, ruta_socket: str = RUTA_SOCKET_POOL) -> List[Dict]:
+    """Mide el rendimiento y la memoria por trabajador de 1 a `max_trabajadores`.
+
+    Para cada N se levanta un pool sin caché (para medir el análisis real), se
+    envían `peticiones` análisis desde N clientes concurrentes y se lee la
+    memoria de cada trabajador en /proc (solo Linux).
+    """
+    textos = [texto for texto, _ in CORPUS_ANIMO]
+    resultados = []
+    for n in range(1, max_trabajadores + 1):
+        pid = os.fork()
+        if pid == 0:
+            codigo = 0
+            try:
+                ServidorPrefork(ruta_socket, n, usar_cache=False).servir()
+            except Exception as e:
+                print(f"Error en el pool: {e}")
+                codigo = 1
+            finally:
+                os._exit(codigo)
+
+        try:
+            _esperar_pool(ruta_socket)
+
+            def cliente(indice: int) -> None:
+                for i in range(indice, peticiones, n):
+                    consultar("mensaje", textos[i % len(textos)], ruta_socket)
+
+            hilos = [threading.Thread(target=cliente, args=(i,)) for i in range(n)]
+            inicio = time.perf_counter()
+            for hilo in hilos:
+                hilo.start()
+            for hilo in hilos:
+                hilo.join()
+            duracion = time.perf_counter() - inicio
+
+            memorias = [memoria_proceso(p) for p in _pids_trabajadores(pid)]
+            resultados.append({
+                "trabajadores": n,
+                "peticiones_s": round(peticiones / duracion, 1),
+                "padre_rss_mb": round(memoria_proceso(pid)["rss_mb"], 1),
+                "rss_trabajador_mb": round(sum(m["rss_mb"] for m in memorias) / len(memorias), 1),
+                "privada_trabajador_mb": round(sum(m["privada_mb"] for m in memorias) / len(memorias), 1),
+            })
+        finally:
+            os.kill(pid, signal.SIGTERM)
+            os.waitpid(pid, 0)
+    return resultados
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Pool pre-fork de análisis de texto")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p_servir = sub.add_parser("servir", help="Inicia el pool y lo supervisa")
+    p_servir.add_argument("--socket", default=RUTA_SOCKET_POOL)
+    p_servir.add_argument("--trabajadores", type=int, default=TRABAJADORES_POOL)
+    p_servir.add_argument("--max-peticiones", type=int, default=MAX_PETICIONES_TRABAJADOR)
+
+    p_medir = sub.add_parser("medir", help="Mide memoria y rendimiento de 1 a N trabajadores")
+    p_medir.add_argument("--socket", default=RUTA_SOCKET_POOL)
+    p_medir.add_argument("--trabajadores", type=int, default=os.cpu_count() or 1)
+    p_medir.add_argument("--peticiones", type=int, default=2000)
+
+    args = parser.parse_args(argv)
+    if args.comando == "servir":
+        ServidorPrefork(args.socket, args.trabajadores, args.max_peticiones).servir()
+    else:
+        print(f"{'N':>3} {'pet/s':>10} {'padre RSS MB':>13} {'RSS/trab MB':>12} {'privada/trab MB':>16}")
+        for r in medir_escalado(args.trabajadores, args.peticiones, args.socket):
+            print(f"{r['trabajadores']:>3} {r['peticiones_s']:>10} {r['padre_rss_mb']:>13} "
+                  f"{r['rss_trabajador_mb']:>12} {r['privada_trabajador_mb']:>16}")
+
+
+if __name__ == "__main__":
+    main()
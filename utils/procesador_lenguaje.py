@@ -1,68 +1,22 @@
 """
 Funciones para el procesamiento de lenguaje natural
+
+El análisis se delega en el motor configurado (ver `utils.motores`).
 """
 import re, string
-from typing import Optional, Tuple, List
-import spacy
-from textblob import TextBlob
-from config.constantes import ESTADOS_ANIMO_KEYWORDS, PATRONES_TIEMPO
-
-# Cargar el modelo de spaCy en español
-try:
-    nlp = spacy.load('es_core_news_md')
-except OSError:
-    # Si el modelo md no está instalado, intentar cargar el modelo pequeño vía spacy
-    try:
-        nlp = spacy.load('es_core_news_sm')
-    except OSError:
-        # Dejar que la excepción suba: el entorno debe tener al menos un modelo spaCy instalado
-        raise
-
-def procesar_entrada(texto: str) -> Tuple[bool, str, str]:
-    """
-    Procesa el texto de entrada y detecta saludos/intenciones
-    Retorna: (es_saludo, texto_limpio, tipo_mensaje)
-    """
-    texto = texto.lower().strip()
-    doc = nlp(texto)
-    
-    # Lista de saludos comunes en español
-    SALUDOS = {
-        'hola', 'buenos días', 'buenas tardes', 'buenas noches',
-        'hey', 'saludos', 'qué tal', 'cómo estás', 'qué hay'
-    }
-    
-    # Detectar saludos
-    es_saludo = False
-    for saludo in SALUDOS:
-        if saludo in texto:
-            es_saludo = True
-            break
-    
-    # Identificar el tipo de mensaje principal (después del saludo si existe)
-    tipo_mensaje = "desconocido"
-    texto_limpio = texto
-    
-    # Si hay saludo, removerlo del texto para análisis
-    if es_saludo:
-        for saludo in SALUDOS:
-            if texto.startswith(saludo):
-                texto_limpio = texto[len(saludo):].strip()
-                break
-    
-    # Detectar tipo de mensaje
-    palabras_estado = {'siento', 'estoy', 'ando', 'soy', 'tengo'}
-    palabras_tiempo = {'minutos', 'horas', 'hora', 'min', 'tiempo'}
-    
-    for token in doc:
-        if token.text in palabras_estado or token.lemma_ in palabras_estado:
-            tipo_mensaje = "estado_animo"
-            break
-        elif token.text in palabras_tiempo or token.lemma_ in palabras_tiempo:
-            tipo_mensaje = "tiempo"
-            break
-    
-    return es_saludo, texto_limpio, tipo_mensaje
+from typing import Optional, Tuple, List, Dict
+from config.constantes import (
+    ESTADOS_ANIMO_KEYWORDS, PATRONES_TIEMPO, CONFIANZA_PALABRAS_CLAVE, CONFIANZA_NEUTRAL
+)
+from utils.motores import obtener_motor
+from utils.cache_analisis import cacheado, consultar_cache
+from utils.plazos import ejecutar_con_plazo
+
+# Lista de saludos comunes en español
+SALUDOS = {
+    'hola', 'buenos días', 'buenas tardes', 'buenas noches',
+    'hey', 'saludos', 'qué tal', 'cómo estás', 'qué hay'
+}
 
 def tiene_negacion(doc) -> bool:
     """
@@ -84,8 +38,10 @@ def detectar_intensidad(texto: str) -> float:
     Detecta la intensidad del estado de ánimo basado en modificadores
     Retorna un multiplicador de intensidad (0.5 - 2.0)
     """
-    doc = nlp(texto.lower())
-    
+    return _intensidad_doc(obtener_motor().procesar(texto.lower()))
+
+def _intensidad_doc(doc) -> float:
+    """Calcula la intensidad sobre un documento ya procesado por el motor"""
     # Palabras que indican intensidad
     intensificadores = {
         'muy': 1.5, 'super': 2.0, 'bastante': 1.3,
@@ -118,30 +74,32 @@ def ajustar_por_contexto(texto: str, estado_inicial: str) -> str:
     """
     Ajusta el estado según el contexto y las negaciones
     """
-    doc = nlp(texto.lower())
+    doc = obtener_motor().procesar(texto.lower())
     if tiene_negacion(doc):
         return invertir_estado(estado_inicial)
     return estado_inicial
 
-def analizar_estado_animo(texto: str) -> Optional[str]:
-    """Analiza el texto del usuario para determinar su estado de ánimo"""
-    # Normalizar el texto
+def _normalizar(texto: str) -> str:
+    """Pasa a minúsculas y elimina la puntuación"""
     texto = texto.lower()
-    texto = ''.join(c for c in texto if c not in string.punctuation)
-    
-    # Crear un TextBlob para análisis de sentimiento
-    # Procesar con spaCy
-    doc = nlp(texto)
-    
-    # Detectar negaciones y ajustar el análisis
-    tiene_neg = tiene_negacion(doc)
-    intensidad = detectar_intensidad(texto)
-    
-    blob = TextBlob(texto)
+    return ''.join(c for c in texto if c not in string.punctuation)
+
+def _contar_keywords(texto: str) -> Tuple[Optional[str], int]:
+    """Retorna el estado con más palabras clave en el texto y cuántas coincidieron"""
+    estado_por_keywords = None
+    max_coincidencias = 0
     
-    # Obtener polaridad del sentimiento (-1 muy negativo, 1 muy positivo)
-    polaridad = blob.sentiment.polarity
+    for estado, keywords in ESTADOS_ANIMO_KEYWORDS.items():
+        coincidencias = sum(1 for kw in keywords if kw in texto)
+        if coincidencias > max_coincidencias:
+            max_coincidencias = coincidencias
+            estado_por_keywords = estado
     
+    return estado_por_keywords, max_coincidencias
+
+def _estado_desde_analisis(polaridad: float, tiene_neg: bool,
+                           estado_por_keywords: Optional[str], max_coincidencias: int) -> str:
+    """Combina sentimiento, palabras clave y negación en el estado final"""
     # Primero intentar con análisis de sentimiento
     if polaridad > 0.3:  # Sentimiento positivo
         estado_por_sentimiento = "motivado"
@@ -150,19 +108,6 @@ def analizar_estado_animo(texto: str) -> Optional[str]:
     else:  # Sentimiento neutral
         estado_por_sentimiento = "normal"
     
-    # Analizar palabras clave específicas
-    estado_por_keywords = None
-    max_coincidencias = 0
-    
-    # Dividir el texto en palabras y lemmatizar
-    palabras = set(texto.split())
-    
-    for estado, keywords in ESTADOS_ANIMO_KEYWORDS.items():
-        coincidencias = sum(1 for kw in keywords if kw in texto)
-        if coincidencias > max_coincidencias:
-            max_coincidencias = coincidencias
-            estado_por_keywords = estado
-    
     # Combinar los resultados
     if max_coincidencias >= 2:  # Si hay al menos 2 palabras clave, priorizar keywords
         return estado_por_keywords
@@ -179,14 +124,250 @@ def analizar_estado_animo(texto: str) -> Optional[str]:
     
     return estado_final
 
-def obtener_descripcion_animo(texto: str) -> tuple[str, str, float]:
-    """Analiza el texto y devuelve (estado, descripcion, confianza)"""
-    blob = TextBlob(texto)
+def _confianza(estado: Optional[str], polaridad: float) -> float:
+    return abs(polaridad) if estado in ["motivado", "cansado"] else 0.5
+
+def analizar_estado_animo(texto: str) -> Optional[str]:
+    """Analiza el texto del usuario para determinar su estado de ánimo"""
+    # Normalizar el texto
+    texto = _normalizar(texto)
+    
+    # Procesar con el motor y detectar negaciones
+    motor = obtener_motor()
+    doc = motor.procesar(texto)
+    tiene_neg = tiene_negacion(doc)
+    
+    # Obtener polaridad del sentimiento (-1 muy negativo, 1 muy positivo)
+    polaridad = motor.polaridad(texto)
+    
+    # Analizar palabras clave específicas
+    estado_por_keywords, max_coincidencias = _contar_keywords(texto)
+    
+    return _estado_desde_analisis(polaridad, tiene_neg, estado_por_keywords, max_coincidencias)
+
+def _animo_reducido(texto: str) -> Tuple[str, str, float]:
+    """Estado de ánimo sin usar el motor: solo palabras clave o, si no hay, neutral.
+
+    Retorna (nivel, estado, confianza) con una confianza baja fija por nivel.
+    """
+    estado, coincidencias = _contar_keywords(_normalizar(texto))
+    if coincidencias:
+        return "palabras_clave", estado, CONFIANZA_PALABRAS_CLAVE
+    return "neutral", "normal", CONFIANZA_NEUTRAL
+
+@cacheado("animo")
+def _descripcion_animo_completa(texto: str) -> tuple[str, str, float]:
     estado = analizar_estado_animo(texto)
-    polaridad = blob.sentiment.polarity
-    confianza = abs(polaridad) if estado in ["motivado", "cansado"] else 0.5
+    polaridad = obtener_motor().polaridad(texto)
+    confianza = _confianza(estado, polaridad)
     return estado, f"Detectado estado de ánimo: {estado} (confianza: {confianza:.2f})", confianza
 
+def _descripcion_animo_reducida(texto: str) -> Tuple[str, tuple]:
+    nivel, estado, confianza = _animo_reducido(texto)
+    detalle = "palabras clave" if nivel == "palabras_clave" else "sin análisis"
+    descripcion = f"Detectado estado de ánimo: {estado} (confianza: {confianza:.2f}, análisis reducido: {detalle})"
+    return nivel, (estado, descripcion, confianza)
+
+def _analizar_con_nivel(completa, funcion_cache: str, texto: str, presupuesto_ms: Optional[float],
+                        alternativa) -> Tuple[str, object]:
+    """Retorna (nivel, resultado); sin presupuesto no hay degradación, solo caché o motor"""
+    if presupuesto_ms is not None:
+        return ejecutar_con_plazo(completa, funcion_cache, texto, presupuesto_ms, alternativa)
+    guardado = consultar_cache(funcion_cache, texto)
+    if guardado is not None:
+        return "cache", guardado
+    return "completo", completa(texto)
+
+def analizar_animo_con_nivel(texto: str, presupuesto_ms: Optional[float] = None) -> Tuple[str, tuple]:
+    """Como `obtener_descripcion_animo`, pero retorna también el nivel de la respuesta.
+
+    El nivel es "completo" solo si el motor analizó el texto en esta llamada;
+    "cache" si el resultado ya estaba guardado y "palabras_clave"/"neutral"
+    si se agotó `presupuesto_ms`.
+    """
+    return _analizar_con_nivel(_descripcion_animo_completa, "animo", texto, presupuesto_ms,
+                               _descripcion_animo_reducida)
+
+def obtener_descripcion_animo(texto: str, presupuesto_ms: Optional[float] = None) -> tuple[str, str, float]:
+    """Analiza el texto y devuelve (estado, descripcion, confianza)
+
+    Con `presupuesto_ms`, si el análisis completo no termina a tiempo se
+    responde solo con palabras clave (o un estado neutral), con una confianza
+    baja y la descripción indicando que el análisis fue reducido.
+    """
+    return analizar_animo_con_nivel(texto, presupuesto_ms)[1]
+
+# Verbos en primera persona que introducen un estado de ánimo ("tengo" se omite:
+# suele introducir tiempo). Se compara la forma y no el lema, para que
+# "¿cómo estás?" no cuente como una declaración del usuario
+VERBOS_ESTADO = {'siento', 'estoy', 'ando', 'soy', 'encuentro'}
+
+NEGACIONES = {'no', 'ni', 'tampoco', 'nunca'}
+
+# Duraciones explícitas: "1:30", "30 minutos", "2 h", "una hora y media", "media hora"
+NUMEROS = {
+    'un': 1, 'uno': 1, 'una': 1, 'dos': 2, 'tres': 3, 'cuatro': 4, 'cinco': 5,
+    'seis': 6, 'siete': 7, 'ocho': 8, 'nueve': 9, 'diez': 10
+}
+PATRON_DURACION = re.compile(
+    r"\b(\d{1,2}):(\d{2})\b"
+    r"|\b(\d{1,3}|" + "|".join(NUMEROS) + r"|media)\s*(minutos?|min|horas?|h|d[ií]as?)\b(\s+y\s+media)?"
+)
+
+# Respuestas sin cifras aceptadas cuando se acaba de preguntar por el tiempo
+PALABRAS_TIEMPO = {
+    'poco': 'poco', 'breve': 'poco', 'corto': 'poco', 'rapido': 'poco', 'rápido': 'poco',
+    'medio': 'medio', 'regular': 'medio', 'moderado': 'medio',
+    'mucho': 'mucho', 'bastante': 'mucho', 'largo': 'mucho'
+}
+
+def _es_palabra_animo(palabra: str) -> bool:
+    """Si la palabra empieza por una de las palabras clave de ánimo de una sola palabra"""
+    return any(
+        palabra.startswith(kw)
+        for keywords in ESTADOS_ANIMO_KEYWORDS.values() for kw in keywords if ' ' not in kw
+    )
+
+def _senales_animo(texto_min: str) -> Tuple[bool, bool]:
+    """Retorna (menciona_animo, declara_animo), sin contar las frases de saludo.
+
+    - menciona_animo: hay una palabra clave de ánimo o un verbo de estado en primera persona
+    - declara_animo: hay ambos ("estoy cansado", "me siento bien")
+    """
+    for saludo in SALUDOS:
+        texto_min = texto_min.replace(saludo, ' ')
+    palabras = _normalizar(texto_min).split()
+    unido = f" {' '.join(palabras)} "
+    verbo = any(p in VERBOS_ESTADO for p in palabras)
+    clave = any(_es_palabra_animo(p) for p in palabras) or any(
+        f" {kw} " in unido
+        for keywords in ESTADOS_ANIMO_KEYWORDS.values() for kw in keywords if ' ' in kw
+    )
+    return verbo or clave, verbo and clave
+
+def _tiempo_del_mensaje(texto_min: str) -> Tuple[Optional[str], Optional[str], Optional[int]]:
+    """Tiempo disponible, solo a partir de una duración explícita (cantidad y unidad, o h:mm)"""
+    for m in PATRON_DURACION.finditer(texto_min):
+        if m.group(1):
+            return obtener_descripcion_tiempo(m.group(0))
+        cantidad, unidad, y_media = m.group(3), m.group(4), m.group(5)
+        if cantidad == 'media':
+            if unidad.startswith('hora'):
+                return obtener_descripcion_tiempo("30 minutos")
+            continue
+        n = int(cantidad) if cantidad.isdigit() else NUMEROS[cantidad]
+        if unidad.startswith('h'):
+            return obtener_descripcion_tiempo(f"{n}:30" if y_media else f"{n} horas")
+        if unidad.startswith('d'):
+            return obtener_descripcion_tiempo(f"{n} dias")
+        return obtener_descripcion_tiempo(f"{n} minutos")
+    return None, None, None
+
+def _tiempo_por_palabras(texto_min: str) -> Tuple[Optional[str], Optional[str], Optional[int]]:
+    """Tiempo a partir de una respuesta sin unidades ("poco", "bastante", "45").
+
+    Se ignoran los cuantificadores que modifican al ánimo ("un poco cansado",
+    "estoy regular") y "no ... mucho" se interpreta como poco tiempo.
+    """
+    palabras = _normalizar(texto_min).split()
+    if len(palabras) == 1 and palabras[0].isdigit():
+        return obtener_descripcion_tiempo(palabras[0])
+    for i, palabra in enumerate(palabras):
+        categoria = PALABRAS_TIEMPO.get(palabra)
+        if categoria is None:
+            continue
+        siguiente = palabras[i + 1] if i + 1 < len(palabras) else ''
+        anterior = palabras[i - 1] if i else ''
+        if _es_palabra_animo(siguiente) or anterior in VERBOS_ESTADO:
+            continue
+        if NEGACIONES & set(palabras[max(0, i - 3):i]):
+            if categoria != 'mucho':
+                continue
+            categoria = 'poco'
+        return obtener_descripcion_tiempo(categoria)
+    return None, None, None
+
+def analizar_mensaje(texto: str, presupuesto_ms: Optional[float] = None,
+                     esperando_tiempo: bool = False) -> Dict:
+    """Analiza un mensaje completo con un solo parseo y extrae todas sus intenciones.
+
+    Permite atender mensajes como "estoy cansado y tengo 30 minutos" en un
+    solo turno. Retorna un diccionario con:
+    - es_saludo: si el mensaje contiene un saludo
+    - estado_animo, confianza, negacion, intensidad: análisis del ánimo
+    - menciona_animo: si hay una palabra de ánimo o un verbo de estado en primera persona
+    - declara_animo: si el usuario afirma cómo se siente ("estoy cansado"); solo
+      entonces conviene reemplazar un estado de ánimo ya conocido
+    - tiempo, descripcion_tiempo, minutos: None si no se menciona una duración
+    - nivel: "completo" si el motor analizó el mensaje en esta llamada, "cache"
+      si ya estaba guardado, o "palabras_clave"/"neutral" si se agotó `presupuesto_ms`
+
+    El tiempo solo se toma de duraciones explícitas ("30 minutos", "1:30").
+    Con `esperando_tiempo` (se acaba de preguntar por el tiempo disponible)
+    también se aceptan respuestas sin unidades como "poco", "bastante" o "45".
+    """
+    nivel, analisis = _analizar_con_nivel(_analizar_mensaje_completo, "mensaje", texto, presupuesto_ms,
+                                          _analizar_mensaje_reducido)
+    analisis = dict(analisis, nivel=nivel)
+    if esperando_tiempo and analisis["tiempo"] is None:
+        categoria, descripcion_tiempo, minutos = _tiempo_por_palabras(texto.lower().strip())
+        if categoria is not None:
+            analisis = dict(analisis, tiempo=categoria, descripcion_tiempo=descripcion_tiempo,
+                            minutos=minutos)
+    return analisis
+
+def _analizar_mensaje_reducido(texto: str) -> Tuple[str, Dict]:
+    """Versión sin motor de `analizar_mensaje`: palabras clave y expresiones regulares"""
+    texto_min = texto.lower().strip()
+    nivel, estado, confianza = _animo_reducido(texto_min)
+    palabras = set(_normalizar(texto_min).split())
+    categoria, descripcion_tiempo, minutos = _tiempo_del_mensaje(texto_min)
+    menciona_animo, declara_animo = _senales_animo(texto_min)
+    return nivel, {
+        "es_saludo": any(saludo in texto_min for saludo in SALUDOS),
+        "estado_animo": estado,
+        "confianza": confianza,
+        "negacion": bool(palabras & NEGACIONES),
+        "intensidad": 1.0,
+        "menciona_animo": menciona_animo,
+        "declara_animo": declara_animo,
+        "tiempo": categoria,
+        "descripcion_tiempo": descripcion_tiempo,
+        "minutos": minutos,
+    }
+
+@cacheado("mensaje")
+def _analizar_mensaje_completo(texto: str) -> Dict:
+    texto_min = texto.lower().strip()
+    normalizado = _normalizar(texto_min)
+    motor = obtener_motor()
+    doc = motor.procesar(normalizado)
+    
+    # Saludo
+    es_saludo = any(saludo in texto_min for saludo in SALUDOS)
+    
+    # Estado de ánimo, reutilizando el mismo documento
+    tiene_neg = tiene_negacion(doc)
+    polaridad = motor.polaridad(normalizado)
+    estado_por_keywords, max_coincidencias = _contar_keywords(normalizado)
+    estado = _estado_desde_analisis(polaridad, tiene_neg, estado_por_keywords, max_coincidencias)
+    menciona_animo, declara_animo = _senales_animo(texto_min)
+    
+    categoria, descripcion_tiempo, minutos = _tiempo_del_mensaje(texto_min)
+    
+    return {
+        "es_saludo": es_saludo,
+        "estado_animo": estado,
+        "confianza": _confianza(estado, polaridad),
+        "negacion": tiene_neg,
+        "intensidad": _intensidad_doc(doc),
+        "menciona_animo": menciona_animo,
+        "declara_animo": declara_animo,
+        "tiempo": categoria,
+        "descripcion_tiempo": descripcion_tiempo,
+        "minutos": minutos,
+    }
+
 def analizar_tiempo(texto: str) -> Optional[str]:
     """Analiza el texto del usuario para determinar el tiempo disponible.
 
@@ -204,6 +385,7 @@ def analizar_tiempo(texto: str) -> Optional[str]:
         return "mucho"
 
 
+@cacheado("tiempo")
 def obtener_descripcion_tiempo(texto: str) -> tuple:
     """Parsea el texto y devuelve una tupla (categoria, descripcion, minutos).
 
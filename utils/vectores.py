@@ -0,0 +1,259 @@
+"""
+Carga del modelo spaCy y reducción de su tabla de vectores.
+
+`es_core_news_md` incluye una tabla de vectores float32 grande que ocupa buena
+parte de la memoria (RSS) de cada proceso. Este módulo permite:
+- Podar el vocabulario de vectores a las N entradas más frecuentes; el resto
+  se reasigna a su vecino más cercano entre las conservadas.
+- Guardar los vectores en float16.
+- Cargar los vectores desde un archivo mapeado en memoria (mmap), de modo que
+  varios procesos compartan las mismas páginas.
+
+Uso:
+    python -m utils.vectores reducir --filas 20000 --float16 --salida modelo_reducido
+    python -m utils.vectores medir instalado modelo_reducido
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from config import constantes
+
+ARCHIVO_VECTORES = "vectores.npy"
+ARCHIVO_INFO = "reduccion.json"
+
+# Corpus fijo para medir la precisión del estado de ánimo entre configuraciones
+CORPUS_ANIMO: List[Tuple[str, str]] = [
+    ("Me siento muy motivado para estudiar", "motivado"),
+    ("Estoy feliz y con muchas ganas", "motivado"),
+    ("Tengo mucha energía hoy", "motivado"),
+    ("Me siento capaz de todo", "motivado"),
+    ("Estoy listo y dispuesto a aprender", "motivado"),
+    ("Hoy me siento excelente", "motivado"),
+    ("Ando inspirado y con entusiasmo", "motivado"),
+    ("Estoy normal", "normal"),
+    ("Más o menos, ni bien ni mal", "normal"),
+    ("Me siento tranquilo y estable", "normal"),
+    ("Regular, como siempre", "normal"),
+    ("Un día común y corriente", "normal"),
+    ("Estoy ok", "normal"),
+    ("No me siento motivado", "cansado"),
+    ("Estoy muy cansado", "cansado"),
+    ("Tengo mucho sueño", "cansado"),
+    ("Me siento agotado y sin ganas", "cansado"),
+    ("Estoy estresado por los exámenes", "cansado"),
+    ("Ando triste y desanimado", "cansado"),
+    ("Me siento aburrido y distraído", "cansado"),
+    ("Tengo mucha pereza", "cansado"),
+    ("Estoy agobiado con tantas tareas", "cansado"),
+]
+
+
+def _cargar_por_nombre(spacy):
+    """Carga el modelo md y, si no está instalado, el sm"""
+    try:
+        return spacy.load('es_core_news_md')
+    except OSError:
+        # Si el modelo md no está instalado, intentar cargar el modelo pequeño vía spacy
+        # (si tampoco está, la excepción sube: debe haber al menos un modelo instalado)
+        return spacy.load('es_core_news_sm')
+
+
+def cargar_modelo_spacy():
+    """Carga el modelo spaCy configurado.
+
+    Si `RUTA_MODELO_REDUCIDO` apunta a un modelo generado con
+    `python -m utils.vectores reducir`, se usa ese modelo y, si `VECTORES_MMAP`
+    está activo, sus vectores se leen mapeados en memoria.
+    """
+    import spacy
+
+    ruta = constantes.RUTA_MODELO_REDUCIDO
+    if not ruta:
+        return _cargar_por_nombre(spacy)
+
+    nlp = spacy.load(ruta)
+    if constantes.VECTORES_MMAP:
+        usar_vectores_mmap(nlp, Path(ruta) / ARCHIVO_VECTORES)
+    return nlp
+
+
+def usar_vectores_mmap(nlp, ruta_vectores: Path) -> None:
+    """Sustituye la tabla de vectores del modelo por una copia mapeada en memoria.
+
+    La tabla cargada por spaCy se libera; las páginas del archivo mapeado se
+    comparten entre todos los procesos que lo abran.
+    """
+    import numpy
+
+    datos = numpy.load(str(ruta_vectores), mmap_mode="r")
+    anteriores = nlp.vocab.vectors.data
+    nlp.vocab.vectors.data = datos
+    try:
+        # Comprobar que el pipeline acepta la tabla (p. ej. en float16)
+        nlp("prueba de vectores")
+    except Exception as e:
+        print(f"Los vectores mapeados no son compatibles ({e}); se usan en float32 en memoria")
+        nlp.vocab.vectors.data = numpy.asarray(datos, dtype="float32")
+    del anteriores
+
+
+def reducir_modelo(modelo: str, filas: int, salida: str, float16: bool = False) -> Dict:
+    """Poda los vectores de `modelo` a `filas` entradas y guarda el resultado en `salida`.
+
+    Las palabras descartadas se reasignan a su vecino más cercano entre las
+    conservadas (`Vocab.prune_vectors`). Retorna información de la reducción.
+    """
+    import numpy
+    import spacy
+
+    nlp = spacy.load(modelo)
+    filas_originales = nlp.vocab.vectors.shape[0]
+    reasignadas = nlp.vocab.prune_vectors(filas)
+
+    datos = numpy.asarray(nlp.vocab.vectors.data).astype("float16" if float16 else "float32")
+    nlp.vocab.vectors.data = datos
+
+    ruta = Path(salida)
+    nlp.to_disk(ruta)
+    numpy.save(str(ruta / ARCHIVO_VECTORES), datos)
+
+    info = {
+        "modelo_origen": modelo,
+        "filas_originales": int(filas_originales),
+        "filas": int(datos.shape[0]),
+        "palabras_reasignadas": len(reasignadas),
+        "dtype": str(datos.dtype),
+        "megabytes": round(datos.nbytes / 1024 / 1024, 2),
+    }
+    with open(ruta / ARCHIVO_INFO, "w", encoding="utf-8") as f:
+        json.dump(info, f, ensure_ascii=False, indent=2)
+    return info
+
+
+def rss_mb() -> float:
+    """Memoria residente actual del proceso en MB"""
+    try:
+        with open("/proc/self/status", "r", encoding="utf-8") as f:
+            for linea in f:
+                if linea.startswith("VmRSS:"):
+                    return int(linea.split()[1]) / 1024
+    except OSError:
+        pass
+    if sys.platform == "win32":
+        return _rss_windows_mb()
+    # En macOS, usar el máximo residente como aproximación
+    import resource
+    maximo = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maximo / 1024 / 1024 if sys.platform == "darwin" else maximo / 1024
+
+
+def _rss_windows_mb() -> float:
+    """Working set del proceso en MB (GetProcessMemoryInfo)"""
+    import ctypes
+    from ctypes import wintypes
+
+    class ContadoresMemoria(ctypes.Structure):
+        _fields_ = [
+            ("cb", wintypes.DWORD),
+            ("PageFaultCount", wintypes.DWORD),
+            ("PeakWorkingSetSize", ctypes.c_size_t),
+            ("WorkingSetSize", ctypes.c_size_t),
+            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+            ("PagefileUsage", ctypes.c_size_t),
+            ("PeakPagefileUsage", ctypes.c_size_t),
+        ]
+
+    contadores = ContadoresMemoria()
+    contadores.cb = ctypes.sizeof(ContadoresMemoria)
+    psapi = ctypes.WinDLL("psapi")
+    psapi.GetProcessMemoryInfo.argtypes = [wintypes.HANDLE, ctypes.POINTER(ContadoresMemoria), wintypes.DWORD]
+    kernel32 = ctypes.WinDLL("kernel32")
+    kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+    proceso = kernel32.GetCurrentProcess()
+    if not psapi.GetProcessMemoryInfo(proceso, ctypes.byref(contadores), contadores.cb):
+        raise ctypes.WinError()
+    return contadores.WorkingSetSize / 1024 / 1024
+
+
+def medir_configuracion(modelo: Optional[str]) -> Dict:
+    """Mide RSS, tiempo de carga y precisión sobre `CORPUS_ANIMO` en este proceso.
+
+    `modelo` es la carpeta de un modelo reducido, o None para el modelo instalado.
+    """
+    constantes.RUTA_MODELO_REDUCIDO = modelo
+    constantes.MOTOR_ANALISIS = "spacy"
+    from utils import procesador_lenguaje
+    from utils.motores import obtener_motor
+
+    rss_inicial = rss_mb()
+    inicio = time.perf_counter()
+    obtener_motor()
+    carga_s = time.perf_counter() - inicio
+    rss_modelo = rss_mb()
+
+    aciertos = sum(
+        1 for texto, esperado in CORPUS_ANIMO
+        if procesador_lenguaje.analizar_estado_animo(texto) == esperado
+    )
+    return {
+        "modelo": modelo or "instalado",
+        "rss_mb": round(rss_modelo, 1),
+        "rss_modelo_mb": round(rss_modelo - rss_inicial, 1),
+        "carga_s": round(carga_s, 2),
+        "precision": aciertos / len(CORPUS_ANIMO),
+    }
+
+
+def medir(modelos: List[Optional[str]]) -> List[Dict]:
+    """Mide cada configuración en un proceso nuevo para que el RSS sea comparable"""
+    resultados = []
+    for modelo in modelos:
+        comando = [sys.executable, "-m", "utils.vectores", "_medir_uno"]
+        if modelo:
+            comando.append(modelo)
+        salida = subprocess.run(comando, capture_output=True, text=True, check=True).stdout
+        resultados.append(json.loads(salida.strip().splitlines()[-1]))
+    return resultados
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Reducción de vectores del modelo spaCy")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p_reducir = sub.add_parser("reducir", help="Poda los vectores y guarda un modelo reducido")
+    p_reducir.add_argument("--modelo", default="es_core_news_md")
+    p_reducir.add_argument("--filas", type=int, default=20000)
+    p_reducir.add_argument("--float16", action="store_true")
+    p_reducir.add_argument("--salida", required=True)
+
+    p_medir = sub.add_parser("medir", help="Compara RSS y precisión entre modelos")
+    p_medir.add_argument("modelos", nargs="*",
+                         help="Carpetas de modelos reducidos ('instalado' para el modelo por defecto)")
+
+    p_uno = sub.add_parser("_medir_uno")
+    p_uno.add_argument("modelo", nargs="?")
+
+    args = parser.parse_args(argv)
+    if args.comando == "reducir":
+        print(json.dumps(reducir_modelo(args.modelo, args.filas, args.salida, args.float16),
+                         ensure_ascii=False, indent=2))
+    elif args.comando == "medir":
+        modelos = [None if m == "instalado" else m for m in (args.modelos or ["instalado"])]
+        print(f"{'modelo':<30} {'RSS MB':>8} {'modelo MB':>10} {'carga s':>8} {'precisión':>10}")
+        for r in medir(modelos):
+            print(f"{r['modelo']:<30} {r['rss_mb']:>8} {r['rss_modelo_mb']:>10} "
+                  f"{r['carga_s']:>8} {r['precision']:>10.1%}")
+    else:
+        print(json.dumps(medir_configuracion(args.modelo), ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()